@@ -0,0 +1,100 @@
+"""
+Ahead-of-time build script for the risk analysis kernels.
+
+Compiles the transaction-scan and risk-score kernels used by the analysis
+agent into a native extension module (risk_kernels) next to this file, so
+the agent gets compiled speed without Numba's JIT warmup or import cost.
+
+Usage (from the repository root, requires numba):
+    python -m src.agents._kernels_build
+
+When the extension is not built, analysis_agent falls back to Numba JIT
+(if installed) or pure Python. The heuristics below are compiled in, so
+rebuild after changing them in analysis_agent; at import, analysis_agent
+checks the extension against _score_features and ignores it (with a
+warning) if they disagree.
+
+numba.pycc is pending deprecation upstream and emits a
+NumbaPendingDeprecationWarning when this script runs. It is still the only
+ahead-of-time compiler Numba ships; if it is removed, skip this build and
+the agent uses the JIT path.
+"""
+
+import os
+from numba.pycc import CC
+
+cc = CC('risk_kernels')
+cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+@cc.export('scan_tx', 'Tuple((i8, i8, i8, f8))(i1[:], f8[:])')
+def scan_tx(types, amounts):
+    """
+    Count gifts and cash-outs in one pass over parallel type/amount arrays.
+    
+    Type codes follow analysis_agent._TYPE_CODES:
+    0 = gift_sent, 1 = gift_received, 2 = cash_out, -1 = other.
+    """
+    gifts_sent = 0
+    gifts_received = 0
+    cash_out_count = 0
+    cash_out_total = 0.0
+    for i in range(types.shape[0]):
+        code = types[i]
+        if code == 0:
+            gifts_sent += 1
+        elif code == 1:
+            gifts_received += 1
+        elif code == 2:
+            cash_out_count += 1
+            cash_out_total += amounts[i]
+    return gifts_sent, gifts_received, cash_out_count, cash_out_total
+
+
+@cc.export('score_feats', 'f8(f8[:])')
+def score_feats(feats):
+    """
+    Score one feature vector built by analysis_agent._extract_risk_features.
+    
+    Mirrors the heuristics in analysis_agent._score_features (thresholds
+    from _AGE_THRESHOLDS/_VELOCITY_THRESHOLDS).
+    """
+    age = feats[0]
+    kyc_missing = feats[1]
+    vpn = feats[2]
+    geo_spread = feats[3]
+    total_flags = feats[4]
+    tx_24h = feats[5]
+    cash_out_ratio = feats[6]
+    
+    score = 0.0
+    
+    if age < 30:
+        score += 20
+    elif age < 90:
+        score += 10
+    
+    if kyc_missing != 0:
+        score += 15
+    
+    if vpn != 0:
+        score += 10
+    
+    if geo_spread > 3:
+        score += 15
+    
+    score += min(total_flags * 10, 30.0)
+    
+    if tx_24h > 20:
+        score += 20
+    elif tx_24h > 10:
+        score += 10
+    
+    if cash_out_ratio > 0.5:
+        score += 15
+    
+    return min(score, 100.0)
+
+
+if __name__ == "__main__":
+    cc.compile()
@@ -5,13 +5,137 @@ This agent analyzes the gathered data to calculate a risk score and
 detect known high-risk patterns.
 """
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple
 from datetime import datetime
+import warnings
+from types import MappingProxyType
+import numpy as np
 from src.state import InvestigationState
-from langchain_openai import ChatOpenAI
-from langchain_core.prompts import ChatPromptTemplate
 from src.config import Config
 
+try:
+    # Ahead-of-time compiled kernels, built by src/agents/_kernels_build.py
+    from src.agents.risk_kernels import scan_tx, score_feats
+except ImportError:
+    scan_tx = score_feats = None
+
+
+# Shared read-only default for missing data sections
+_EMPTY = MappingProxyType({})
+
+# Heuristic threshold tables. Points are indexed by where a feature falls
+# relative to the sorted thresholds, so each heuristic is one table lookup.
+# Account age: < 30 days -> 20, < 90 days -> 10, otherwise 0
+_AGE_THRESHOLDS = np.array([30, 90])
+_AGE_POINTS = np.array([20.0, 10.0, 0.0])
+# Transactions in the last 24h: > 20 -> 20, > 10 -> 10, otherwise 0
+_VELOCITY_THRESHOLDS = np.array([10, 20])
+_VELOCITY_POINTS = np.array([0.0, 10.0, 20.0])
+
+
+def _extract_risk_features(raw_data: Dict[str, Any]) -> List[float]:
+    """
+    Extract the numeric features used by the risk heuristics.
+    
+    Args:
+        raw_data: Comprehensive data package
+        
+    Returns:
+        Feature vector [account_age_days, kyc_missing, vpn, geographic_spread,
+        total_flags, last_24h_transactions, cash_out_ratio]
+    """
+    profile = raw_data.get('profile') or _EMPTY
+    activity = raw_data.get('activity') or _EMPTY
+    flags = raw_data.get('flags') or _EMPTY
+    transactions = raw_data.get('transactions') or _EMPTY
+    
+    return [
+        profile.get('account_age_days', 365),
+        not profile.get('kyc_completed', True),
+        activity.get('vpn_usage_detected', False),
+        activity.get('geographic_spread', 1),
+        flags.get('total_flags', 0),
+        transactions.get('last_24h_transactions', 0),
+        transactions.get('cash_out_ratio', 0)
+    ]
+
+
+def _score_features(feats: np.ndarray) -> np.ndarray:
+    """
+    Score a 2D feature matrix (one row per entity) in a single numpy pass.
+    
+    Args:
+        feats: Array of shape (n_entities, 7) built by _extract_risk_features
+        
+    Returns:
+        Array of risk scores from 0-100
+    """
+    age, kyc_missing, vpn, geo_spread, total_flags, tx_24h, cash_out_ratio = feats.T
+    
+    score = (
+        _AGE_POINTS[np.searchsorted(_AGE_THRESHOLDS, age, side='right')]
+        + 15 * (kyc_missing != 0)
+        + 10 * (vpn != 0)
+        + 15 * (geo_spread > 3)
+        + np.clip(total_flags * 10, 0, 30)  # Cap at 30
+        + _VELOCITY_POINTS[np.searchsorted(_VELOCITY_THRESHOLDS, tx_24h, side='left')]
+        + 15 * (cash_out_ratio > 0.5)
+    )
+    
+    return np.clip(score, 0, 100)  # Cap at 100
+
+
+# Feature rows on either side of every heuristic threshold, used to check a
+# prebuilt risk_kernels extension against _score_features
+_KERNEL_CHECK_FEATS = np.array([
+    [0, 0, 0, 1, 0, 0, 0.0],
+    [29, 1, 0, 3, 1, 10, 0.5],
+    [30, 0, 1, 4, 2, 11, 0.51],
+    [89, 1, 1, 4, 3, 20, 1.0],
+    [90, 0, 0, 1, 4, 21, 0.0],
+    [365, 1, 1, 5, 5, 50, 0.9],
+], dtype=np.float64)
+
+
+def _aot_kernels_current() -> bool:
+    """
+    Check the ahead-of-time kernels against the Python heuristics.
+    
+    The extension is compiled separately, so it keeps the thresholds it was
+    built with until it is rebuilt.
+    
+    Returns:
+        True if the kernels agree with _score_features and _TYPE_CODES
+    """
+    try:
+        scores = [score_feats(row) for row in _KERNEL_CHECK_FEATS]
+        counts = scan_tx(
+            np.array([0, 1, 1, 2, 2, -1], dtype=np.int8),
+            np.array([5.0, 1.0, 1.0, 20.0, 30.0, 7.0])
+        )
+    except Exception:  # Built with an older signature
+        return False
+    
+    return (
+        np.array_equal(scores, _score_features(_KERNEL_CHECK_FEATS))
+        and tuple(counts) == (1, 2, 2, 50.0)
+    )
+
+
+if score_feats is not None and not _aot_kernels_current():
+    warnings.warn(
+        "src/agents/risk_kernels is out of date with analysis_agent and will be ignored; "
+        "rebuild it with: python -m src.agents._kernels_build"
+    )
+    scan_tx = score_feats = None
+
+njit = None
+if scan_tx is None:
+    try:
+        from numba import njit
+    except ImportError:  # numba is optional; fall back to pure Python scanning
+        pass
+
 
 def calculate_base_risk_score(raw_data: Dict[str, Any]) -> float:
     """
@@ -23,49 +147,116 @@ def calculate_base_risk_score(raw_data: Dict[str, Any]) -> float:
     Returns:
         Risk score from 0-100
     """
-    score = 0.0
+    if not raw_data:
+        return 0.0
     
-    profile = raw_data.get('profile', {})
-    activity = raw_data.get('activity', {})
-    flags = raw_data.get('flags', {})
-    transactions = raw_data.get('transactions', {})
+    feats = np.array(_extract_risk_features(raw_data), dtype=np.float64)
     
-    # Account age risk (newer accounts = higher risk)
-    account_age_days = profile.get('account_age_days', 365)
-    if account_age_days < 30:
-        score += 20
-    elif account_age_days < 90:
-        score += 10
+    if score_feats is not None:
+        return score_feats(feats)
     
-    # Verification status
-    if not profile.get('kyc_completed', True):
-        score += 15
-    
-    # VPN usage
-    if activity.get('vpn_usage_detected', False):
-        score += 10
+    return float(_score_features(feats[np.newaxis, :])[0])
+
+
+def calculate_base_risk_scores(raw_data_list: List[Dict[str, Any]]) -> np.ndarray:
+    """
+    Calculate base risk scores for many entities at once.
     
-    # Geographic spread (multiple countries = suspicious)
-    if activity.get('geographic_spread', 1) > 3:
-        score += 15
+    Args:
+        raw_data_list: Data packages, one per entity
+        
+    Returns:
+        Array of risk scores from 0-100, in input order
+    """
+    if not raw_data_list:
+        return np.zeros(0)
     
-    # Past flags
-    total_flags = flags.get('total_flags', 0)
-    score += min(total_flags * 10, 30)  # Cap at 30
+    feats = np.array([_extract_risk_features(d) for d in raw_data_list], dtype=np.float64)
+    return _score_features(feats)
+
+
+# Score adjustment per detected pattern, by severity (unknown severities count as low)
+_SEVERITY_ADJUSTMENTS = {'critical': 15, 'high': 10, 'medium': 5, 'low': 2}
+
+# Transaction type codes used by the compiled scan kernel
+_TYPE_CODES = {'gift_sent': 0, 'gift_received': 1, 'cash_out': 2}
+
+
+def _scan_transactions_py(recent_transactions: List[Dict[str, Any]]) -> Tuple[int, int, int, float]:
+    """
+    Count gifts and cash-outs in recent transactions (pure Python path).
     
-    # Transaction velocity
-    last_24h_transactions = transactions.get('last_24h_transactions', 0)
-    if last_24h_transactions > 20:
-        score += 20
-    elif last_24h_transactions > 10:
-        score += 10
+    Args:
+        recent_transactions: List of transaction records
+        
+    Returns:
+        Tuple of (gifts_sent, gifts_received, cash_out_count, cash_out_total)
+    """
+    gifts_sent = gifts_received = cash_out_count = 0
+    cash_out_total = 0
+    
+    for t in recent_transactions:
+        transaction_type = t.get('type')
+        if transaction_type == 'gift_sent':
+            gifts_sent += 1
+        elif transaction_type == 'gift_received':
+            gifts_received += 1
+        elif transaction_type == 'cash_out':
+            cash_out_count += 1
+            cash_out_total += t.get('amount', 0)
+    
+    return gifts_sent, gifts_received, cash_out_count, cash_out_total
+
+
+if scan_tx is not None:
+    _scan_kernel = scan_tx
+elif njit is not None:
+    @njit(cache=True)
+    def _scan_kernel(types, amounts):
+        gifts_sent = gifts_received = cash_out_count = 0
+        cash_out_total = 0.0
+        for i in range(types.shape[0]):
+            code = types[i]
+            if code == 0:
+                gifts_sent += 1
+            elif code == 1:
+                gifts_received += 1
+            elif code == 2:
+                cash_out_count += 1
+                cash_out_total += amounts[i]
+        return gifts_sent, gifts_received, cash_out_count, cash_out_total
+    
+    # Compile (or load from cache) at import rather than on the first investigation
+    _scan_kernel(np.zeros(0, dtype=np.int8), np.zeros(0, dtype=np.float64))
+else:
+    _scan_kernel = None
+
+
+def _scan_transactions(recent_transactions: List[Dict[str, Any]]) -> Tuple[int, int, int, float]:
+    """
+    Count gifts and cash-outs in recent transactions.
     
-    # Cash-out ratio (high cash-out activity is suspicious)
-    cash_out_ratio = transactions.get('cash_out_ratio', 0)
-    if cash_out_ratio > 0.5:
-        score += 15
+    Uses the compiled kernel when available (ahead-of-time build first, then
+    Numba JIT): transactions are converted once into parallel type/amount
+    arrays and counted in a single compiled pass.
     
-    return min(score, 100)  # Cap at 100
+    Args:
+        recent_transactions: List of transaction records
+        
+    Returns:
+        Tuple of (gifts_sent, gifts_received, cash_out_count, cash_out_total)
+    """
+    if _scan_kernel is None:
+        return _scan_transactions_py(recent_transactions)
+    
+    n = len(recent_transactions)
+    types = np.fromiter(
+        (_TYPE_CODES.get(t.get('type'), -1) for t in recent_transactions), np.int8, count=n
+    )
+    amounts = np.fromiter(
+        (t.get('amount', 0) for t in recent_transactions), np.float64, count=n
+    )
+    return _scan_kernel(types, amounts)
 
 
 def detect_patterns(raw_data: Dict[str, Any]) -> List[Dict[str, Any]]:
@@ -80,31 +271,41 @@ def detect_patterns(raw_data: Dict[str, Any]) -> List[Dict[str, Any]]:
     """
     patterns = []
     
-    activity = raw_data.get('activity', {})
-    transactions = raw_data.get('transactions', {})
-    flags = raw_data.get('flags', {})
-    connections = raw_data.get('connections', {})
+    activity = raw_data.get('activity') or _EMPTY
+    transactions = raw_data.get('transactions') or _EMPTY
+    flags = raw_data.get('flags') or _EMPTY
+    connections = raw_data.get('connections') or _EMPTY
     
-    # Pattern 1: Wash Trading Detection
+    # Bind every input the patterns read in one place
     recent_transactions = transactions.get('recent_transactions', [])
-    gift_sent = [t for t in recent_transactions if t.get('type') == 'gift_sent']
-    gift_received = [t for t in recent_transactions if t.get('type') == 'gift_received']
+    last_24h_volume = transactions.get('last_24h_volume_usd', 0)
+    vpn_detected = activity.get('vpn_usage_detected', False)
+    follows = connections.get('follows', 0)
+    followers = connections.get('followers', 0)
+    linked_accounts = connections.get('linked_accounts', [])
+    past_flags = flags.get('past_flags', [])
     
-    if len(gift_sent) > 5 and len(gift_received) > 5:
+    # Nothing can fire without transactions, VPN usage, a follow spike,
+    # linked accounts or past flags (common for brand-new entities)
+    if not (recent_transactions or vpn_detected or follows > 500 or linked_accounts or past_flags):
+        return patterns
+    
+    # Count gifts and cash-outs once for patterns 1 and 3
+    gifts_sent, gifts_received, cash_out_count, total_cash_out = _scan_transactions(recent_transactions)
+    
+    # Pattern 1: Wash Trading Detection
+    if gifts_sent > 5 and gifts_received > 5:
         patterns.append({
             "pattern_type": "wash_trading",
             "severity": "high",
-            "description": f"Circular gifting pattern detected: {len(gift_sent)} gifts sent, {len(gift_received)} received",
+            "description": f"Circular gifting pattern detected: {gifts_sent} gifts sent, {gifts_received} received",
             "evidence": {
-                "gifts_sent": len(gift_sent),
-                "gifts_received": len(gift_received)
+                "gifts_sent": gifts_sent,
+                "gifts_received": gifts_received
             }
         })
     
     # Pattern 2: Rapid Follow/Unfollow
-    follows = connections.get('follows', 0)
-    followers = connections.get('followers', 0)
-    
     if follows > 500 and followers < 50:
         patterns.append({
             "pattern_type": "rapid_follow_unfollow",
@@ -118,60 +319,65 @@ def detect_patterns(raw_data: Dict[str, Any]) -> List[Dict[str, Any]]:
         })
     
     # Pattern 3: Sudden Cash-Out
-    cash_out_transactions = [t for t in recent_transactions if t.get('type') == 'cash_out']
-    if cash_out_transactions:
-        total_cash_out = sum(t.get('amount', 0) for t in cash_out_transactions)
-        if total_cash_out > 1000:
-            patterns.append({
-                "pattern_type": "sudden_cash_out",
-                "severity": "high",
-                "description": f"High-value cash-out detected: ${total_cash_out:.2f}",
-                "evidence": {
-                    "total_amount": total_cash_out,
-                    "num_transactions": len(cash_out_transactions)
-                }
-            })
+    if cash_out_count and total_cash_out > 1000:
+        patterns.append({
+            "pattern_type": "sudden_cash_out",
+            "severity": "high",
+            "description": f"High-value cash-out detected: ${total_cash_out:.2f}",
+            "evidence": {
+                "total_amount": total_cash_out,
+                "num_transactions": cash_out_count
+            }
+        })
     
     # Pattern 4: VPN/Proxy Usage with High-Value Activity
-    if activity.get('vpn_usage_detected') and transactions.get('last_24h_volume_usd', 0) > 500:
+    if vpn_detected and last_24h_volume > 500:
         patterns.append({
             "pattern_type": "vpn_with_high_value",
             "severity": "medium",
             "description": "VPN usage combined with high-value transactions",
             "evidence": {
                 "vpn_detected": True,
-                "24h_volume": transactions.get('last_24h_volume_usd')
+                "24h_volume": last_24h_volume
             }
         })
     
     # Pattern 5: Multi-Account Coordination
-    linked_accounts = connections.get('linked_accounts', [])
-    high_confidence_links = [acc for acc in linked_accounts if acc.get('confidence', 0) > 0.8]
-    
-    if len(high_confidence_links) > 2:
+    confidences = np.fromiter(
+        (acc.get('confidence', 0) for acc in linked_accounts), np.float64, count=len(linked_accounts)
+    )
+    high_confidence_mask = confidences > 0.8
+    high_confidence_count = int(high_confidence_mask.sum())
+    
+    if high_confidence_count > 2:
+        # Only materialize the matching accounts when the pattern fires
+        high_confidence_links = [linked_accounts[i] for i in np.flatnonzero(high_confidence_mask)]
         patterns.append({
             "pattern_type": "multi_account_coordination",
             "severity": "high",
-            "description": f"Multiple linked accounts detected: {len(high_confidence_links)} high-confidence connections",
+            "description": f"Multiple linked accounts detected: {high_confidence_count} high-confidence connections",
             "evidence": {
                 "total_connections": len(linked_accounts),
-                "high_confidence": len(high_confidence_links),
+                "high_confidence": high_confidence_count,
                 "relationships": [acc.get('relationship') for acc in high_confidence_links]
             }
         })
     
     # Pattern 6: Repeat Offender
-    past_flags = flags.get('past_flags', [])
-    high_severity_flags = [f for f in past_flags if f.get('severity') == 'high']
+    high_severity_mask = np.fromiter(
+        (f.get('severity') == 'high' for f in past_flags), np.bool_, count=len(past_flags)
+    )
+    high_severity_count = int(high_severity_mask.sum())
     
-    if len(high_severity_flags) >= 2:
+    if high_severity_count >= 2:
+        high_severity_flags = [past_flags[i] for i in np.flatnonzero(high_severity_mask)]
         patterns.append({
             "pattern_type": "repeat_offender",
             "severity": "critical",
-            "description": f"Multiple high-severity flags in history: {len(high_severity_flags)} incidents",
+            "description": f"Multiple high-severity flags in history: {high_severity_count} incidents",
             "evidence": {
                 "total_flags": flags.get('total_flags'),
-                "high_severity_count": len(high_severity_flags),
+                "high_severity_count": high_severity_count,
                 "flag_types": [f.get('flag_type') for f in high_severity_flags]
             }
         })
@@ -179,7 +385,7 @@ def detect_patterns(raw_data: Dict[str, Any]) -> List[Dict[str, Any]]:
     return patterns
 
 
-def analysis_agent(state: InvestigationState) -> InvestigationState:
+def analysis_agent(state: InvestigationState) -> Dict[str, Any]:
     """
     Risk Scoring and Pattern Detection Agent.
     
@@ -189,13 +395,13 @@ def analysis_agent(state: InvestigationState) -> InvestigationState:
         state: Current investigation state with raw_data
         
     Returns:
-        Updated state with risk_score and detected_patterns
+        State update with risk_score and detected_patterns
     """
     print(f"\n{'='*60}")
     print(f"NODE 2: RISK SCORING AND PATTERN DETECTION")
     print(f"{'='*60}")
     
-    raw_data = state.get('raw_data', {})
+    raw_data = state.get('raw_data') or {}
     
     # Calculate base risk score
     print("\n🔍 Calculating risk score...")
@@ -206,24 +412,10 @@ def analysis_agent(state: InvestigationState) -> InvestigationState:
     patterns = detect_patterns(raw_data)
     
     # Adjust score based on patterns
-    pattern_adjustment = 0
-    for pattern in patterns:
-        severity = pattern.get('severity', 'low')
-        if severity == 'critical':
-            pattern_adjustment += 15
-        elif severity == 'high':
-            pattern_adjustment += 10
-        elif severity == 'medium':
-            pattern_adjustment += 5
-        else:
-            pattern_adjustment += 2
+    pattern_adjustment = sum(_SEVERITY_ADJUSTMENTS.get(p.get('severity', 'low'), 2) for p in patterns)
     
     final_score = min(base_score + pattern_adjustment, 100)
     
-    # Update state
-    state['risk_score'] = final_score
-    state['detected_patterns'] = patterns
-    
     print(f"\n✅ Risk analysis complete")
     print(f"   Base risk score: {base_score:.1f}")
     print(f"   Pattern adjustment: +{pattern_adjustment:.1f}")
@@ -232,7 +424,6 @@ def analysis_agent(state: InvestigationState) -> InvestigationState:
     
     if patterns:
         print("\n   Detected patterns:")
-        for pattern in patterns:
-            print(f"   - {pattern['pattern_type']} ({pattern['severity']}): {pattern['description']}")
+        print("\n".join(f"   - {p['pattern_type']} ({p['severity']}): {p['description']}" for p in patterns))
     
-    return state
+    return {"risk_score": final_score, "detected_patterns": patterns}
@@ -12,25 +12,42 @@ from src.config import Config
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
 import re
 
-def chat_router(state: InvestigationState) -> InvestigationState:
+# Entity extraction patterns, compiled once at import time.
+# Matches standard ID formats like "USER_123", "ACC_456", "TXN_789"
+_ID_RE = re.compile(r'\b(USER|ACC|TXN)[-_]?(\w+)\b', re.IGNORECASE)
+# Fallback for phrasing like "investigate user 123"
+_INVESTIGATE_RE = re.compile(r'investigate\s+(?:user|account|transaction)?\s*(\w+)', re.IGNORECASE)
+
+# Router progress output (stdout writes add up on the server hot path)
+_VERBOSE = Config.VERBOSE
+
+
+def chat_router(state: InvestigationState) -> Dict[str, Any]:
     """
     Analyzes input to determine if it's a chat message or structured input.
     Extracts entity information from chat messages if needed.
+    
+    Returns only the fields it changes; LangGraph merges them into the state
+    and appends returned messages to the chat history.
     """
-    print(f"\n{'='*60}")
-    print(f"ROUTER: ANALYZING INPUT")
-    print(f"{'='*60}")
+    if _VERBOSE:
+        print(f"\n{'='*60}")
+        print(f"ROUTER: ANALYZING INPUT")
+        print(f"{'='*60}")
     
     # Case 1: Structured Input (Entity ID already provided)
-    if state.get('entity_id') and state['entity_id'] != "UNKNOWN":
-        print(f"✅ Structured input detected: {state['entity_id']}")
-        return state
+    entity_id = state.get('entity_id')
+    if entity_id and entity_id != "UNKNOWN":
+        if _VERBOSE:
+            print(f"✅ Structured input detected: {entity_id}")
+        return {}
         
     # Case 2: Chat Input
     messages = state.get('messages', [])
     if not messages:
-        print("⚠️ No input provided")
-        return state
+        if _VERBOSE:
+            print("⚠️ No input provided")
+        return {}
         
     # Get last user message
     last_message = messages[-1]
@@ -41,7 +58,8 @@ def chat_router(state: InvestigationState) -> InvestigationState:
         text_parts = [block.get('text', '') for block in content if isinstance(block, dict) and block.get('type') == 'text']
         content = " ".join(text_parts)
         
-    print(f"📨 Received message: {content}")
+    if _VERBOSE:
+        print(f"📨 Received message: {content}")
     
     # Simple regex extraction for entities
     # Looks for patterns like "USER_123", "ACC_456", "TXN_789"
@@ -51,8 +69,7 @@ def chat_router(state: InvestigationState) -> InvestigationState:
     entity_type = "user"
     
     # Regex for standard ID formats
-    id_pattern = r'\b(USER|ACC|TXN)[-_]?(\w+)\b'
-    match = re.search(id_pattern, content, re.IGNORECASE)
+    match = _ID_RE.search(content)
     
     if match:
         prefix = match.group(1).upper()
@@ -66,40 +83,51 @@ def chat_router(state: InvestigationState) -> InvestigationState:
             
     # Fallback: Look for "investigate X" pattern
     if not entity_id:
-        investigate_pattern = r'investigate\s+(?:user|account|transaction)?\s*(\w+)'
-        match = re.search(investigate_pattern, content, re.IGNORECASE)
+        match = _INVESTIGATE_RE.search(content)
         if match:
             entity_id = match.group(1)
             # Default to user if not specified, or try to infer
-            if "account" in content.lower():
+            lowered = content.lower()
+            if "account" in lowered:
                 entity_type = "account"
-            elif "transaction" in content.lower():
+            elif "transaction" in lowered:
                 entity_type = "transaction"
     
     if entity_id:
-        print(f"✅ Extracted Entity: {entity_id} ({entity_type})")
-        state['entity_id'] = entity_id
-        state['entity_type'] = entity_type
-        
+        if _VERBOSE:
+            print(f"✅ Extracted Entity: {entity_id} ({entity_type})")
         # Add confirmation message
-        if isinstance(messages, list):
-            state['messages'].append(
+        return {
+            "entity_id": entity_id,
+            "entity_type": entity_type,
+            "messages": [
                 AIMessage(content=f"I've identified the entity **{entity_id}**. Starting investigation now...")
-            )
-    else:
+            ]
+        }
+    
+    if _VERBOSE:
         print("❓ No entity found in message")
-        # Add clarification request
-        if isinstance(messages, list):
-            state['messages'].append(
-                AIMessage(content="I can help you investigate high-risk entities. Please provide an Entity ID (e.g., 'Investigate USER_001').")
-            )
-            
-    return state
+    # Add clarification request
+    return {
+        "messages": [
+            AIMessage(content="I can help you investigate high-risk entities. Please provide an Entity ID (e.g., 'Investigate USER_001').")
+        ]
+    }
+
+def chat_router_structured(state: InvestigationState) -> Dict[str, Any]:
+    """
+    Entry node for callers that always supply a structured entity_id (CLI/API).
+    
+    Skips chat parsing and router output entirely; route_from_chat still ends
+    the run if no entity_id was provided.
+    """
+    return {}
 
 def route_from_chat(state: InvestigationState) -> str:
     """
     Determines next step based on whether entity_id was found.
     """
-    if state.get('entity_id') and state['entity_id'] != "UNKNOWN":
+    entity_id = state.get('entity_id')
+    if entity_id and entity_id != "UNKNOWN":
         return "triage"
     return "__end__"
@@ -5,30 +5,18 @@ This agent makes the final decision based on risk score, patterns, and policy re
 Includes RAG integration for policy compliance.
 """
 
-from typing import Dict, Any
+import re
+from typing import Dict, Any, Optional
+from functools import lru_cache
+from types import MappingProxyType
 from src.state import InvestigationState
 from langchain_core.prompts import ChatPromptTemplate
 from src.config import Config
 
 
-def get_policy_guidance(risk_score: float, patterns: list) -> str:
-    """
-    Get relevant policy guidance based on the case.
-    
-    In a production system, this would use RAG to retrieve relevant policy sections.
-    For this demo, we return mock policy guidance.
-    
-    Args:
-        risk_score: Calculated risk score
-        patterns: Detected patterns
-        
-    Returns:
-        Relevant policy text
-    """
-    risk_level = Config.get_risk_level(risk_score)
-    
-    policies = {
-        "low": """
+# Mock policy sections by risk level (would be retrieved via RAG in production)
+_POLICY_TEXT = {
+    "low": """
 Risk Management Policy Section 2.1 - Low Risk Entities
 
 For entities with risk scores 0-25:
@@ -37,7 +25,7 @@ For entities with risk scores 0-25:
 - Schedule routine review in 30 days
 - Maintain standard monitoring protocols
 """,
-        "medium": """
+    "medium": """
 Risk Management Policy Section 2.2 - Medium Risk Entities
 
 For entities with risk scores 26-50:
@@ -47,7 +35,7 @@ For entities with risk scores 26-50:
 - Schedule review in 14 days
 - Document all suspicious activities
 """,
-        "high": """
+    "high": """
 Risk Management Policy Section 2.3 - High Risk Entities
 
 For entities with risk scores 51-75:
@@ -58,7 +46,7 @@ For entities with risk scores 51-75:
 - Schedule review within 48 hours
 - Consider account suspension if patterns persist
 """,
-        "critical": """
+    "critical": """
 Risk Management Policy Section 2.4 - Critical Risk Entities
 
 For entities with risk scores 76-100:
@@ -69,42 +57,76 @@ For entities with risk scores 76-100:
 - Notify law enforcement if criminal activity suspected
 - Begin formal investigation process
 """
-    }
+}
+
+# Read-only, pre-stripped policy sections
+_POLICIES = MappingProxyType({level: text.strip() for level, text in _POLICY_TEXT.items()})
+
+_REPEAT_OFFENDER_PROTOCOL = "\n\n⚠️ REPEAT OFFENDER PROTOCOL: Previous violations on record. Apply strictest interpretation of policy."
+_WASH_TRADING_PROTOCOL = "\n\n⚠️ WASH TRADING PROTOCOL: Evidence of market manipulation. Consider permanent ban."
+
+# Pattern-specific guidance keyed by (repeat_offender, wash_trading)
+_POLICY_APPENDICES = MappingProxyType({
+    (False, False): "",
+    (True, False): _REPEAT_OFFENDER_PROTOCOL,
+    (False, True): _WASH_TRADING_PROTOCOL,
+    (True, True): _REPEAT_OFFENDER_PROTOCOL + _WASH_TRADING_PROTOCOL,
+})
+
+
+@lru_cache(maxsize=32)
+def _policy_for(risk_level: str, repeat_offender: bool, wash_trading: bool) -> str:
+    """
+    Assemble policy text for a risk level and pattern signature.
     
-    base_policy = policies.get(risk_level, policies["low"])
+    Args:
+        risk_level: Risk level (low/medium/high/critical)
+        repeat_offender: Whether a repeat_offender pattern was detected
+        wash_trading: Whether a wash_trading pattern was detected
+        
+    Returns:
+        Relevant policy text
+    """
+    base_policy = _POLICIES.get(risk_level, _POLICIES["low"])
     
     # Add pattern-specific guidance
-    if any(p.get('pattern_type') == 'repeat_offender' for p in patterns):
-        base_policy += "\n\n⚠️ REPEAT OFFENDER PROTOCOL: Previous violations on record. Apply strictest interpretation of policy."
-    
-    if any(p.get('pattern_type') == 'wash_trading' for p in patterns):
-        base_policy += "\n\n⚠️ WASH TRADING PROTOCOL: Evidence of market manipulation. Consider permanent ban."
-    
-    return base_policy.strip()
+    return base_policy + _POLICY_APPENDICES[(repeat_offender, wash_trading)]
 
 
-def generate_recommendation_with_llm(
-    entity_id: str,
-    risk_score: float,
-    narrative: str,
-    policy_guidance: str
-) -> Dict[str, Any]:
+def get_policy_guidance(risk_score: float, patterns: list, risk_level: Optional[str] = None) -> str:
     """
-    Generate final recommendation using LLM.
+    Get relevant policy guidance based on the case.
+    
+    In a production system, this would use RAG to retrieve relevant policy sections.
+    For this demo, we return mock policy guidance.
     
     Args:
-        entity_id: Entity being investigated
-        risk_score: Risk score
-        narrative: Investigation narrative
-        policy_guidance: Relevant policy sections
+        risk_score: Calculated risk score
+        patterns: Detected patterns
+        risk_level: Risk level for risk_score, if already known
         
     Returns:
-        Recommendation dictionary
+        Relevant policy text
     """
-    llm = Config.get_llm()
-    
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", """You are a senior compliance officer making final decisions on risk cases.
+    if risk_level is None:
+        risk_level = Config.get_risk_level(risk_score)
+    
+    repeat_offender = wash_trading = False
+    for p in patterns:
+        pattern_type = p.get('pattern_type')
+        if pattern_type == 'repeat_offender':
+            repeat_offender = True
+        elif pattern_type == 'wash_trading':
+            wash_trading = True
+        if repeat_offender and wash_trading:
+            break
+    
+    return _policy_for(risk_level, repeat_offender, wash_trading)
+
+
+# Decision prompt, parsed once at import time
+_DECISION_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", """You are a senior compliance officer making final decisions on risk cases.
 Your decisions must:
 - Be based strictly on evidence and policy
 - Include clear justification
@@ -112,7 +134,7 @@ Your decisions must:
 - Consider regulatory compliance
 - Balance risk mitigation with customer experience
 """),
-        ("user", """Review the following investigation and provide your final recommendation.
+    ("user", """Review the following investigation and provide your final recommendation.
 
 INVESTIGATION NARRATIVE:
 {narrative}
@@ -129,7 +151,118 @@ Provide your decision in the following format:
 4. NEXT STEPS: [Specific actions to be taken]
 5. ESCALATION: [Yes/No - whether this requires senior review]
 """)
-    ])
+])
+
+
+@lru_cache(maxsize=1)
+def _decision_chain():
+    """
+    Get the decision chain (prompt | llm), built on first use.
+    
+    Built lazily so the rule-based fallback path never constructs an LLM client.
+    
+    Returns:
+        Runnable chain for the decision prompt
+    """
+    return _DECISION_PROMPT | Config.get_llm()
+
+
+# Parses the five fields requested by the decision prompt in one pass.
+# Tolerates list numbering and markdown bold around the labels, on either side
+# of the colon ("**DECISION:**" and "**DECISION**:").
+_DECISION_RE = re.compile(
+    r'DECISION[\s*]*:[\s*]*([\w-]+).*?'
+    r'CONFIDENCE[\s*]*:[\s*]*(\d+).*?'
+    r'JUSTIFICATION[\s*]*:[\s*]*(.+?)[\s*#]*(?:\d+\.)?[\s*#]*NEXT STEPS[\s*]*:[\s*]*'
+    r'(.+?)[\s*#]*(?:\d+\.)?[\s*#]*ESCALATION[\s*]*:[\s*]*(\w+)',
+    re.S
+)
+
+# First word of the model's DECISION field -> Config.RISK_ACTIONS action
+_LLM_DECISIONS = MappingProxyType({
+    "approve": Config.RISK_ACTIONS["low"],
+    "monitor": Config.RISK_ACTIONS["medium"],
+    "soft-ban": Config.RISK_ACTIONS["high"],
+    "softban": Config.RISK_ACTIONS["high"],
+    "soft": Config.RISK_ACTIONS["high"],
+    "full": Config.RISK_ACTIONS["critical"],
+    "suspension": Config.RISK_ACTIONS["critical"],
+    "suspend": Config.RISK_ACTIONS["critical"],
+})
+_LLM_ESCALATION = MappingProxyType({"yes": True, "no": False})
+# Splits the NEXT STEPS field into individual steps
+_STEP_SPLIT_RE = re.compile(r'[\n;]')
+
+# Field labels the decision prompt asks for; ESCALATION is always last
+_DECISION_FIELDS = ("DECISION:", "CONFIDENCE:", "JUSTIFICATION:", "NEXT STEPS:", "ESCALATION:")
+
+
+def _stream_decision(inputs: Dict[str, Any]) -> str:
+    """
+    Stream the LLM decision, stopping once every requested field is complete.
+    
+    Lines are checked for field labels as they arrive. Once the ESCALATION
+    label has been seen, the stream is closed as soon as the complete lines
+    received so far parse with a value for every field, instead of waiting
+    for any trailing commentary. If they never do (for example when the value
+    follows on a later line), the stream is read to the end.
+    
+    Args:
+        inputs: Prompt variables for the decision chain
+        
+    Returns:
+        Decision text received so far
+    """
+    chunks = []
+    pending_line = ""
+    seen_fields = set()
+    
+    for chunk in _decision_chain().stream(inputs):
+        chunks.append(chunk.content)
+        pending_line += chunk.content
+        
+        # Only complete lines can be classified
+        *lines, pending_line = pending_line.split("\n")
+        if not lines:
+            continue
+        for line in lines:
+            label = line.lstrip("0123456789.-# ").replace("*", "").upper()
+            for field in _DECISION_FIELDS:
+                if label.startswith(field):
+                    seen_fields.add(field)
+                    break
+        
+        if len(seen_fields) == len(_DECISION_FIELDS):
+            received = "".join(chunks)
+            match = _DECISION_RE.search(received[:len(received) - len(pending_line)])
+            if match and match.group(5):
+                break
+    
+    return "".join(chunks)
+
+
+def generate_recommendation_with_llm(
+    entity_id: str,
+    risk_score: float,
+    narrative: str,
+    policy_guidance: str,
+    risk_level: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Generate final recommendation using LLM.
+    
+    Args:
+        entity_id: Entity being investigated
+        risk_score: Risk score
+        narrative: Investigation narrative
+        policy_guidance: Relevant policy sections
+        risk_level: Risk level for risk_score, if already known
+        
+    Returns:
+        Recommendation dictionary
+    """
+    if risk_level is None:
+        risk_level = Config.get_risk_level(risk_score)
     
     inputs = {
         "narrative": narrative,
@@ -137,27 +270,47 @@ Provide your decision in the following format:
         "policy_guidance": policy_guidance
     }
     
-    chain = prompt | llm
-    response = chain.invoke(inputs)
+    llm_analysis = _stream_decision(inputs)
     
     # Parse response into structured format
-    return {
+    recommendation = {
         "entity_id": entity_id,
-        "decision": Config.get_recommended_action(risk_score),
+        "decision": Config.RISK_ACTIONS[risk_level],
         "risk_score": risk_score,
-        "risk_level": Config.get_risk_level(risk_score),
-        "llm_analysis": response.content,
-        "confidence": 85,  # Could be extracted from LLM response
+        "risk_level": risk_level,
+        "llm_analysis": llm_analysis,
+        "confidence": 85,  # Default when the response doesn't follow the format
         "policy_citations": policy_guidance,
         "requires_escalation": risk_score > Config.RISK_THRESHOLD_HIGH
     }
+    
+    # Adopt the model's structured answer only when its decision names a known
+    # action, so the decision always matches the justification shown with it.
+    # Otherwise the rule-based recommendation stands and the raw text stays in
+    # llm_analysis.
+    match = _DECISION_RE.search(llm_analysis)
+    decision = _LLM_DECISIONS.get(match.group(1).lower()) if match else None
+    if decision is not None:
+        _, confidence, justification, next_steps, escalation = match.groups()
+        recommendation["decision"] = decision
+        recommendation["requires_escalation"] = _LLM_ESCALATION.get(
+            escalation.lower(), recommendation["requires_escalation"]
+        )
+        recommendation["confidence"] = min(int(confidence), 100)
+        recommendation["justification"] = justification.strip()
+        recommendation["next_steps"] = [
+            step.strip(" -•*\t") for step in _STEP_SPLIT_RE.split(next_steps) if step.strip(" -•*\t")
+        ]
+    
+    return recommendation
 
 
 def generate_recommendation_fallback(
     entity_id: str,
     risk_score: float,
     patterns: list,
-    policy_guidance: str
+    policy_guidance: str,
+    risk_level: Optional[str] = None
 ) -> Dict[str, Any]:
     """
     Generate recommendation without LLM (fallback).
@@ -167,12 +320,14 @@ def generate_recommendation_fallback(
         risk_score: Risk score
         patterns: Detected patterns
         policy_guidance: Policy guidance
+        risk_level: Risk level for risk_score, if already known
         
     Returns:
         Recommendation dictionary
     """
-    decision = Config.get_recommended_action(risk_score)
-    risk_level = Config.get_risk_level(risk_score)
+    if risk_level is None:
+        risk_level = Config.get_risk_level(risk_score)
+    decision = Config.RISK_ACTIONS[risk_level]
     
     # Generate justification
     justification_parts = []
@@ -230,7 +385,7 @@ def generate_recommendation_fallback(
     }
 
 
-def decision_agent(state: InvestigationState) -> InvestigationState:
+def decision_agent(state: InvestigationState) -> Dict[str, Any]:
     """
     Recommendation and Review Agent.
     
@@ -240,7 +395,7 @@ def decision_agent(state: InvestigationState) -> InvestigationState:
         state: Current investigation state with all analysis complete
         
     Returns:
-        Updated state with final recommendation
+        State update with final recommendation, metadata and summary message
     """
     print(f"\n{'='*60}")
     print(f"NODE 4: RECOMMENDATION AND REVIEW")
@@ -251,8 +406,11 @@ def decision_agent(state: InvestigationState) -> InvestigationState:
     narrative = state.get('narrative', '')
     patterns = state.get('detected_patterns', [])
     
+    # Every step below keys off the same risk level, so resolve it once
+    risk_level = Config.get_risk_level(risk_score)
+    
     print("\n⚖️  Reviewing policy requirements...")
-    policy_guidance = get_policy_guidance(risk_score, patterns)
+    policy_guidance = get_policy_guidance(risk_score, patterns, risk_level)
     
     print("⚖️  Generating final recommendation...")
     
@@ -260,32 +418,38 @@ def decision_agent(state: InvestigationState) -> InvestigationState:
     try:
         if Config.has_api_key():
             recommendation = generate_recommendation_with_llm(
-                entity_id, risk_score, narrative, policy_guidance
+                entity_id, risk_score, narrative, policy_guidance, risk_level
             )
             print(f"   Using {Config.LLM_PROVIDER.upper()} LLM-enhanced decision making")
         else:
             recommendation = generate_recommendation_fallback(
-                entity_id, risk_score, patterns, policy_guidance
+                entity_id, risk_score, patterns, policy_guidance, risk_level
             )
             print("   Using rule-based decision making (no API key configured)")
     except Exception as e:
         print(f"   ⚠️  LLM decision failed: {str(e)}")
         print("   Falling back to rule-based decision making")
         recommendation = generate_recommendation_fallback(
-            entity_id, risk_score, patterns, policy_guidance
+            entity_id, risk_score, patterns, policy_guidance, risk_level
         )
     
-    # Update state
-    state['recommendation'] = recommendation
+    update = {"recommendation": recommendation}
     
     # Update metadata
-    if state.get('metadata'):
-        state['metadata']['decision_timestamp'] = 'now'
-        state['metadata']['final_risk_level'] = recommendation.get('risk_level')
+    metadata = state.get('metadata')
+    if metadata:
+        update['metadata'] = {
+            **metadata,
+            'decision_timestamp': 'now',
+            'final_risk_level': recommendation.get('risk_level')
+        }
+    
+    decision = recommendation.get('decision')
+    risk_level_label = recommendation.get('risk_level', '').upper()
     
     print(f"\n✅ Decision complete")
-    print(f"   FINAL DECISION: {recommendation.get('decision')}")
-    print(f"   Risk Level: {recommendation.get('risk_level', '').upper()}")
+    print(f"   FINAL DECISION: {decision}")
+    print(f"   Risk Level: {risk_level_label}")
     print(f"   Confidence: {recommendation.get('confidence', 0)}%")
     print(f"   Requires Escalation: {'Yes' if recommendation.get('requires_escalation') else 'No'}")
     
@@ -295,17 +459,17 @@ def decision_agent(state: InvestigationState) -> InvestigationState:
     summary = f"""### 🏁 Investigation Complete
     
 **Entity:** `{entity_id}`
-**Decision:** {recommendation.get('decision')}
-**Risk Level:** {recommendation.get('risk_level', '').upper()} ({risk_score:.1f}/100)
+**Decision:** {decision}
+**Risk Level:** {risk_level_label} ({risk_score:.1f}/100)
 
 **Justification:**
 {recommendation.get('justification', recommendation.get('llm_analysis', ''))}
 
 **Next Steps:**
-{chr(10).join(['- ' + step for step in recommendation.get('next_steps', [])])}
+{chr(10).join('- ' + step for step in recommendation.get('next_steps', []))}
 """
     
-    # MessagesState guarantees 'messages' key exists
-    state['messages'].append(AIMessage(content=summary))
+    # The messages reducer appends this to the chat history
+    update['messages'] = [AIMessage(content=summary)]
     
-    return state
+    return update
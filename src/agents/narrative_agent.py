@@ -5,20 +5,172 @@ This agent synthesizes the investigation findings into a clear,
 plain-language narrative suitable for decision makers.
 """
 
-from typing import Dict, Any
+import json
+import threading
+from collections import OrderedDict, deque
+from typing import Dict, Any, Optional, Tuple
+from functools import lru_cache
+from operator import itemgetter
+import numpy as np
 from src.state import InvestigationState
 from langchain_core.prompts import ChatPromptTemplate
 from src.config import Config
 
 
-def generate_narrative_with_llm(
+# Static investigator instructions for the narrative prompt
+_NARRATIVE_SYSTEM = """You are an expert financial investigator tasked with creating clear, 
+concise investigation narratives. Your narratives should be:
+- Professional and objective
+- Focused on facts and evidence
+- Clear for both technical and non-technical audiences
+
+Structure every narrative with these sections:
+1. Executive Summary (2-3 sentences)
+2. Timeline of Suspicious Activities
+3. Specific Evidence Citations
+4. Quantified Impact Assessment
+
+Cite the specific figures from the case (amounts, counts, dates, flags) as
+evidence, and do not speculate beyond the data provided.
+
+Case data is given as compact JSON with these fields:
+- entity_id, risk_score (0-100)
+- account_age (days), verification_status, country
+- total_transactions, transaction_volume (USD), past_flags (count)
+- patterns: detected patterns as "TYPE (severity): description" (empty if none)
+- last_24h_transactions, last_24h_volume (USD)
+- vpn_detected, geo_spread (distinct login locations), linked_accounts (count)
+"""
+
+# Per-case data: the only part of a narrative request that varies
+_CASE_TEMPLATE = "CASE DATA: {case_json}\n"
+
+# Narrative prompt, parsed once at import time.
+# All static instructions live in the system message so every request shares
+# an identical prefix (eligible for provider-side prompt caching); the user
+# message carries only the per-case fields.
+_NARRATIVE_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", _NARRATIVE_SYSTEM),
+    ("user", "Generate an investigation narrative for the following case:\n\n" + _CASE_TEMPLATE)
+])
+
+@lru_cache(maxsize=2)
+def _narrative_chain(model: Optional[str] = None):
+    """
+    Get the narrative chain (prompt | llm), built on first use per model.
+    
+    Built lazily so the template fallback path never constructs an LLM client.
+    
+    Args:
+        model: Model override (None uses LLM_MODEL)
+    
+    Returns:
+        Runnable chain for the narrative prompt
+    """
+    return _NARRATIVE_PROMPT | Config.get_llm(model)
+
+
+@lru_cache(maxsize=1)
+def _embeddings():
+    """
+    Get the embeddings client used by the semantic cache, built on first use.
+    
+    Returns:
+        LangChain embeddings client
+    """
+    return Config.get_embeddings()
+
+
+# Semantic narrative cache: entity_id -> recent (unit-normalized case embedding, narrative).
+# Keyed by entity so a near-identical case never returns another entity's narrative.
+# Bounded in both directions (least recently used entities are evicted, and only
+# the newest entries per entity are kept) and guarded by a lock, since narratives
+# are generated from worker threads and the async node.
+_SEMANTIC_CACHE_MAX_ENTITIES = 1024
+_SEMANTIC_CACHE_MAX_PER_ENTITY = 8
+_SEMANTIC_CACHE: "OrderedDict[str, deque]" = OrderedDict()
+_SEMANTIC_CACHE_LOCK = threading.Lock()
+
+
+def _semantic_cache_key(fields: Dict[str, Any], risk_score: float) -> str:
+    """
+    Build a deterministic case summary to embed for the semantic cache.
+    
+    Args:
+        fields: Case fields from _case_fields
+        risk_score: Calculated risk score
+        
+    Returns:
+        Case summary string with rounded numeric features
+    """
+    return (
+        f"risk={round(risk_score)} age={fields['account_age']} "
+        f"verification={fields['verification_status']} country={fields['country']} "
+        f"transactions={fields['total_transactions']} volume={round(fields['transaction_volume'])} "
+        f"flags={fields['past_flags']} tx24h={fields['last_24h_transactions']} "
+        f"volume24h={round(fields['last_24h_volume'])} vpn={fields['vpn_detected']} "
+        f"geo={fields['geo_spread']} links={fields['linked_accounts']}\n"
+        f"{chr(10).join(fields['patterns'])}"
+    )
+
+
+def _semantic_cache_lookup(entity_id: str, key: str) -> Tuple[Optional[str], np.ndarray]:
+    """
+    Find a cached narrative for a near-identical case of the same entity.
+    
+    Args:
+        entity_id: Entity being investigated
+        key: Case summary from _semantic_cache_key
+        
+    Returns:
+        Tuple of (cached narrative or None, unit-normalized key embedding)
+    """
+    vector = np.asarray(_embeddings().embed_query(key), dtype=np.float64)
+    vector /= np.linalg.norm(vector) or 1.0
+    
+    with _SEMANTIC_CACHE_LOCK:
+        entries = _SEMANTIC_CACHE.get(entity_id)
+        if entries:
+            _SEMANTIC_CACHE.move_to_end(entity_id)
+            entries = list(entries)
+    
+    if entries:
+        similarities = np.stack([cached for cached, _ in entries]) @ vector
+        best = int(np.argmax(similarities))
+        if similarities[best] >= Config.SEMANTIC_CACHE_THRESHOLD:
+            return entries[best][1], vector
+    
+    return None, vector
+
+
+def _semantic_cache_store(entity_id: str, vector: np.ndarray, narrative: str):
+    """
+    Remember a generated narrative for later semantic cache lookups.
+    
+    Args:
+        entity_id: Entity being investigated
+        vector: Unit-normalized key embedding from _semantic_cache_lookup
+        narrative: Generated narrative
+    """
+    with _SEMANTIC_CACHE_LOCK:
+        entries = _SEMANTIC_CACHE.get(entity_id)
+        if entries is None:
+            entries = _SEMANTIC_CACHE[entity_id] = deque(maxlen=_SEMANTIC_CACHE_MAX_PER_ENTITY)
+            if len(_SEMANTIC_CACHE) > _SEMANTIC_CACHE_MAX_ENTITIES:
+                _SEMANTIC_CACHE.popitem(last=False)
+        else:
+            _SEMANTIC_CACHE.move_to_end(entity_id)
+        entries.append((vector, narrative))
+
+
+def _case_fields(
     entity_id: str,
     risk_score: float,
     patterns: list,
     raw_data: Dict[str, Any]
-) -> str:
+) -> Dict[str, Any]:
     """
-    Generate investigation narrative using LLM.
+    Collect the per-case data described in the narrative system prompt.
     
     Args:
         entity_id: Entity being investigated
@@ -27,50 +179,8 @@ def generate_narrative_with_llm(
         raw_data: Complete data package
         
     Returns:
-        Formatted narrative string
+        Case fields keyed as listed in _NARRATIVE_SYSTEM
     """
-    # Initialize LLM
-    llm = Config.get_llm()
-    
-    # Create prompt template
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", """You are an expert financial investigator tasked with creating clear, 
-concise investigation narratives. Your narratives should be:
-- Professional and objective
-- Focused on facts and evidence
-- Clear for both technical and non-technical audiences
-- Structured with sections: Executive Summary, Timeline, Evidence, and Impact Assessment
-"""),
-        ("user", """Generate an investigation narrative for the following case:
-
-ENTITY ID: {entity_id}
-RISK SCORE: {risk_score}/100
-
-ACCOUNT INFORMATION:
-- Account Age: {account_age} days
-- Verification Status: {verification_status}
-- Country: {country}
-- Total Transactions: {total_transactions}
-- Transaction Volume: ${transaction_volume}
-- Past Flags: {past_flags}
-
-DETECTED PATTERNS:
-{patterns_text}
-
-ADDITIONAL CONTEXT:
-- 24h Transaction Activity: {last_24h_transactions} transactions, ${last_24h_volume}
-- VPN Usage: {vpn_detected}
-- Geographic Spread: {geo_spread} different locations
-- Linked Accounts: {linked_accounts}
-
-Please provide a structured investigation narrative with:
-1. Executive Summary (2-3 sentences)
-2. Timeline of Suspicious Activities
-3. Specific Evidence Citations
-4. Quantified Impact Assessment
-""")
-    ])
-    
     # Extract data
     profile = raw_data.get('profile', {})
     activity = raw_data.get('activity', {})
@@ -78,35 +188,120 @@ Please provide a structured investigation narrative with:
     flags = raw_data.get('flags', {})
     connections = raw_data.get('connections', {})
     
-    # Format patterns
-    patterns_text = "\n".join([
-        f"- {p['pattern_type'].upper()} ({p['severity']}): {p['description']}"
-        for p in patterns
-    ]) if patterns else "No suspicious patterns detected"
+    # Format patterns (sorted so identical findings give a byte-identical,
+    # cacheable prompt regardless of detection order)
+    pattern_lines = [
+        f"{p['pattern_type'].upper()} ({p['severity']}): {p['description']}"
+        for p in sorted(patterns, key=itemgetter('pattern_type'))
+    ]
     
-    # Prepare inputs
-    inputs = {
+    return {
         "entity_id": entity_id,
-        "risk_score": f"{risk_score:.1f}",
+        "risk_score": round(risk_score, 1),
         "account_age": profile.get('account_age_days', 'N/A'),
         "verification_status": profile.get('verification_status', 'N/A'),
         "country": profile.get('country', 'N/A'),
         "total_transactions": transactions.get('total_transactions', 0),
-        "transaction_volume": f"{transactions.get('total_volume_usd', 0):.2f}",
+        "transaction_volume": round(transactions.get('total_volume_usd', 0), 2),
         "past_flags": flags.get('total_flags', 0),
-        "patterns_text": patterns_text,
+        "patterns": pattern_lines,
         "last_24h_transactions": transactions.get('last_24h_transactions', 0),
-        "last_24h_volume": f"{transactions.get('last_24h_volume_usd', 0):.2f}",
-        "vpn_detected": "Yes" if activity.get('vpn_usage_detected') else "No",
+        "last_24h_volume": round(transactions.get('last_24h_volume_usd', 0), 2),
+        "vpn_detected": bool(activity.get('vpn_usage_detected')),
         "geo_spread": activity.get('geographic_spread', 1),
         "linked_accounts": connections.get('total_connections', 0)
     }
+
+
+def _narrative_inputs(fields: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Prepare the prompt variables for a narrative from its case fields.
     
-    # Generate narrative
-    chain = prompt | llm
-    response = chain.invoke(inputs)
+    Args:
+        fields: Case fields from _case_fields
+        
+    Returns:
+        Prompt variables for _CASE_TEMPLATE (compact case JSON)
+    """
+    return {"case_json": json.dumps(fields, separators=(",", ":"))}
+
+
+def generate_narrative_with_llm(
+    entity_id: str,
+    risk_score: float,
+    patterns: list,
+    raw_data: Dict[str, Any],
+    model: Optional[str] = None
+) -> str:
+    """
+    Generate investigation narrative using LLM.
+    
+    Args:
+        entity_id: Entity being investigated
+        risk_score: Calculated risk score
+        patterns: Detected suspicious patterns
+        raw_data: Complete data package
+        model: Model override (None uses LLM_MODEL)
+        
+    Returns:
+        Formatted narrative string
+    """
+    fields = _case_fields(entity_id, risk_score, patterns, raw_data)
+    
+    # Reuse the narrative of a near-identical earlier investigation if enabled
+    if Config.SEMANTIC_CACHE_ENABLED:
+        cached, vector = _semantic_cache_lookup(entity_id, _semantic_cache_key(fields, risk_score))
+        if cached is not None:
+            return cached
     
-    return response.content
+    # Generate narrative. invoke() rather than stream(): only non-streaming
+    # calls read and write the LLM response cache (see Config.LLM_CACHE)
+    narrative = _narrative_chain(model).invoke(_narrative_inputs(fields)).content
+    
+    if Config.SEMANTIC_CACHE_ENABLED:
+        _semantic_cache_store(entity_id, vector, narrative)
+    
+    return narrative
+
+
+async def agenerate_narrative_with_llm(
+    entity_id: str,
+    risk_score: float,
+    patterns: list,
+    raw_data: Dict[str, Any],
+    model: Optional[str] = None
+) -> str:
+    """
+    Async variant of generate_narrative_with_llm.
+    
+    Awaits the LLM instead of blocking, so concurrent investigations (e.g.
+    app.abatch) overlap their narrative calls.
+    
+    Args:
+        entity_id: Entity being investigated
+        risk_score: Calculated risk score
+        patterns: Detected suspicious patterns
+        raw_data: Complete data package
+        model: Model override (None uses LLM_MODEL)
+        
+    Returns:
+        Formatted narrative string
+    """
+    fields = _case_fields(entity_id, risk_score, patterns, raw_data)
+    
+    # Reuse the narrative of a near-identical earlier investigation if enabled
+    if Config.SEMANTIC_CACHE_ENABLED:
+        cached, vector = _semantic_cache_lookup(entity_id, _semantic_cache_key(fields, risk_score))
+        if cached is not None:
+            return cached
+    
+    # Generate narrative (ainvoke, so the LLM response cache applies)
+    narrative = (await _narrative_chain(model).ainvoke(_narrative_inputs(fields))).content
+    
+    if Config.SEMANTIC_CACHE_ENABLED:
+        _semantic_cache_store(entity_id, vector, narrative)
+    
+    return narrative
 
 
 def generate_narrative_fallback(
@@ -134,7 +329,8 @@ def generate_narrative_fallback(
     
     risk_level = Config.get_risk_level(risk_score)
     
-    narrative = f"""
+    # Collect the sections and join once instead of growing a string
+    parts = [f"""
 INVESTIGATION NARRATIVE
 Entity ID: {entity_id}
 Risk Score: {risk_score:.1f}/100 ({risk_level.upper()} RISK)
@@ -158,17 +354,19 @@ Past Security Flags: {flags.get('total_flags', 0)}
 
 DETECTED PATTERNS & EVIDENCE
 ─────────────────────────────────────────────────────────────
-"""
+"""]
     
     if patterns:
-        for i, pattern in enumerate(patterns, 1):
-            narrative += f"\n{i}. {pattern['pattern_type'].replace('_', ' ').upper()} ({pattern['severity'].upper()} SEVERITY)"
-            narrative += f"\n   Description: {pattern['description']}"
-            narrative += f"\n   Evidence: {pattern.get('evidence', {})}\n"
+        parts.extend(
+            f"\n{i}. {pattern['pattern_type'].replace('_', ' ').upper()} ({pattern['severity'].upper()} SEVERITY)"
+            f"\n   Description: {pattern['description']}"
+            f"\n   Evidence: {pattern.get('evidence', {})}\n"
+            for i, pattern in enumerate(patterns, 1)
+        )
     else:
-        narrative += "\nNo suspicious patterns detected.\n"
+        parts.append("\nNo suspicious patterns detected.\n")
     
-    narrative += f"""
+    parts.append(f"""
 IMPACT ASSESSMENT
 ─────────────────────────────────────────────────────────────
 Financial Exposure: ${transactions.get('total_volume_usd', 0):.2f} total volume
@@ -178,22 +376,21 @@ Network Risk: {raw_data.get('connections', {}).get('total_connections', 0)} link
 Historical Risk: {flags.get('total_flags', 0)} past flags
 
 ═══════════════════════════════════════════════════════════════
-"""
+""")
     
-    return narrative.strip()
+    return "".join(parts).strip()
 
 
-def narrative_agent(state: InvestigationState) -> InvestigationState:
+def _prepare_narrative(state: InvestigationState) -> Tuple[str, float, list, Dict[str, Any], Optional[str], Optional[str]]:
     """
-    Narrative Generation Agent.
-    
-    Synthesizes findings into a clear investigation narrative.
+    Print the node header and resolve the inputs and routing for a narrative.
     
     Args:
         state: Current investigation state with risk_score, patterns, and raw_data
         
     Returns:
-        Updated state with narrative
+        Tuple of (entity_id, risk_score, patterns, raw_data, risk_level, model);
+        risk_level is None unless model routing is enabled
     """
     print(f"\n{'='*60}")
     print(f"NODE 3: NARRATIVE GENERATION")
@@ -206,11 +403,52 @@ def narrative_agent(state: InvestigationState) -> InvestigationState:
     
     print("\n📝 Generating investigation narrative...")
     
+    # Route by risk level when enabled: low-risk cases get the template and
+    # medium-risk cases the cheaper model
+    risk_level = Config.get_risk_level(risk_score) if Config.MODEL_ROUTING_ENABLED else None
+    model = Config.get_fast_model() if risk_level == "medium" else None
+    
+    return entity_id, risk_score, patterns, raw_data, risk_level, model
+
+
+def _narrative_update(narrative: str) -> Dict[str, Any]:
+    """
+    Print the node summary and build its state update.
+    
+    Args:
+        narrative: Generated narrative
+        
+    Returns:
+        State update with narrative
+    """
+    print(f"\n✅ Narrative generation complete")
+    print(f"   Length: {len(narrative)} characters")
+    
+    return {"narrative": narrative}
+
+
+def narrative_agent(state: InvestigationState) -> Dict[str, Any]:
+    """
+    Narrative Generation Agent.
+    
+    Synthesizes findings into a clear investigation narrative.
+    
+    Args:
+        state: Current investigation state with risk_score, patterns, and raw_data
+        
+    Returns:
+        State update with narrative
+    """
+    entity_id, risk_score, patterns, raw_data, risk_level, model = _prepare_narrative(state)
+    
     # Try to use LLM, fall back to template if API key not configured
     try:
-        if Config.has_api_key():
-            narrative = generate_narrative_with_llm(entity_id, risk_score, patterns, raw_data)
-            print(f"   Using {Config.LLM_PROVIDER.upper()} LLM-generated narrative")
+        if risk_level == "low":
+            narrative = generate_narrative_fallback(entity_id, risk_score, patterns, raw_data)
+            print("   Using template-based narrative (low risk)")
+        elif Config.has_api_key():
+            narrative = generate_narrative_with_llm(entity_id, risk_score, patterns, raw_data, model)
+            print(f"   Using {Config.LLM_PROVIDER.upper()} LLM-generated narrative ({model or Config.LLM_MODEL})")
         else:
             narrative = generate_narrative_fallback(entity_id, risk_score, patterns, raw_data)
             print("   Using template-based narrative (no API key configured)")
@@ -219,10 +457,38 @@ def narrative_agent(state: InvestigationState) -> InvestigationState:
         print("   Falling back to template-based narrative")
         narrative = generate_narrative_fallback(entity_id, risk_score, patterns, raw_data)
     
-    # Update state
-    state['narrative'] = narrative
+    return _narrative_update(narrative)
+
+
+async def anarrative_agent(state: InvestigationState) -> Dict[str, Any]:
+    """
+    Async Narrative Generation Agent.
     
-    print(f"\n✅ Narrative generation complete")
-    print(f"   Length: {len(narrative)} characters")
+    Same as narrative_agent, but awaits the LLM so the graph's async entry
+    points (ainvoke/abatch) can overlap narrative calls across entities.
+    
+    Args:
+        state: Current investigation state with risk_score, patterns, and raw_data
+        
+    Returns:
+        State update with narrative
+    """
+    entity_id, risk_score, patterns, raw_data, risk_level, model = _prepare_narrative(state)
+    
+    # Try to use LLM, fall back to template if API key not configured
+    try:
+        if risk_level == "low":
+            narrative = generate_narrative_fallback(entity_id, risk_score, patterns, raw_data)
+            print("   Using template-based narrative (low risk)")
+        elif Config.has_api_key():
+            narrative = await agenerate_narrative_with_llm(entity_id, risk_score, patterns, raw_data, model)
+            print(f"   Using {Config.LLM_PROVIDER.upper()} LLM-generated narrative ({model or Config.LLM_MODEL})")
+        else:
+            narrative = generate_narrative_fallback(entity_id, risk_score, patterns, raw_data)
+            print("   Using template-based narrative (no API key configured)")
+    except Exception as e:
+        print(f"   ⚠️  LLM generation failed: {str(e)}")
+        print("   Falling back to template-based narrative")
+        narrative = generate_narrative_fallback(entity_id, risk_score, patterns, raw_data)
     
-    return state
+    return _narrative_update(narrative)
@@ -11,7 +11,7 @@ from src.state import InvestigationState
 from src.tools.data_gathering import gather_all_data
 
 
-def triage_agent(state: InvestigationState) -> InvestigationState:
+def triage_agent(state: InvestigationState) -> Dict[str, Any]:
     """
     Triage and Data Gathering Agent.
     
@@ -21,7 +21,7 @@ def triage_agent(state: InvestigationState) -> InvestigationState:
         state: Current investigation state with entity_id and entity_type
         
     Returns:
-        Updated state with raw_data populated
+        State update with raw_data and metadata
     """
     print(f"\n{'='*60}")
     print(f"NODE 1: TRIAGE AND DATA GATHERING")
@@ -53,14 +53,11 @@ def triage_agent(state: InvestigationState) -> InvestigationState:
         "data_completeness": "complete"
     }
     
-    # Update state
-    state['raw_data'] = raw_data
-    state['metadata'] = metadata
-    
     print(f"\n✅ Data gathering complete")
     print(f"   Sources queried: {len(raw_data.get('data_sources', []))}")
     print(f"   Account age: {raw_data.get('profile', {}).get('account_age_days', 'N/A')} days")
     print(f"   Total transactions: {raw_data.get('transactions', {}).get('total_transactions', 0)}")
     print(f"   Past flags: {raw_data.get('flags', {}).get('total_flags', 0)}")
     
-    return state
+    # Return only the changed fields; LangGraph merges them into the state
+    return {"raw_data": raw_data, "metadata": metadata}
@@ -3,10 +3,42 @@ Configuration management for the High-Risk Investigation Agent.
 """
 
 import os
+from bisect import bisect_left
+from functools import lru_cache
+from typing import Optional
 from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
+# Load environment variables (once per process, even across module reloads)
+if not os.environ.get("_LG_ENV_LOADED"):
+    load_dotenv()
+    os.environ["_LG_ENV_LOADED"] = "1"
+
+
+@lru_cache(maxsize=4)
+def _build_llm(provider: str, model: str, temperature: float, api_key: str, cache=None):
+    """
+    Construct an LLM client. Cached so repeated calls with the same settings
+    reuse one client instead of rebuilding it.
+    
+    cache is the response cache attached to this client (None defers to any
+    process-wide LangChain cache the host application has set).
+    """
+    if provider == "google":
+        from langchain_google_genai import ChatGoogleGenerativeAI
+        return ChatGoogleGenerativeAI(
+            model=model,
+            temperature=temperature,
+            google_api_key=api_key,
+            cache=cache
+        )
+    else:  # openai
+        from langchain_openai import ChatOpenAI
+        return ChatOpenAI(
+            model=model,
+            temperature=temperature,
+            api_key=api_key,
+            cache=cache
+        )
 
 
 class Config:
@@ -21,15 +53,37 @@ class Config:
     
     # LLM Model Configuration
     LLM_MODEL = os.getenv("LLM_MODEL", "gemini-pro")
-    LLM_TEMPERATURE = float(os.getenv("LLM_TEMPERATURE", "0.7"))
+    LLM_TEMPERATURE = float(os.getenv("LLM_TEMPERATURE", "0.0"))  # Deterministic output keeps cached responses meaningful
+    
+    # LLM Response Cache: "memory", "sqlite" (persists across runs) or "none".
+    # Attached to this application's LLM clients only; the process-wide
+    # LangChain cache is left to the host application.
+    LLM_CACHE = os.getenv("LLM_CACHE", "memory").lower()
+    LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", ".llm_cache.db")
+    LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "1000"))  # Max entries for the memory cache
+    
+    # Semantic Narrative Cache (reuses narratives for near-identical re-investigations)
+    SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "false").lower() in ("1", "true", "yes")
+    SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95"))  # Cosine similarity
+    EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "")  # Defaults per provider when empty
+    
+    # Risk-based Model Routing: template narratives for low risk, the fast model
+    # for medium risk and LLM_MODEL for high/critical risk
+    MODEL_ROUTING_ENABLED = os.getenv("MODEL_ROUTING_ENABLED", "false").lower() in ("1", "true", "yes")
+    LLM_MODEL_FAST = os.getenv("LLM_MODEL_FAST", "")  # Defaults per provider when empty
     
     # Risk Score Thresholds
     RISK_THRESHOLD_LOW = int(os.getenv("RISK_THRESHOLD_LOW", "25"))
     RISK_THRESHOLD_MEDIUM = int(os.getenv("RISK_THRESHOLD_MEDIUM", "50"))
     RISK_THRESHOLD_HIGH = int(os.getenv("RISK_THRESHOLD_HIGH", "75"))
     
+    # Upper bounds (inclusive) of each level, for bisect lookups
+    _RISK_THRESHOLDS = (RISK_THRESHOLD_LOW, RISK_THRESHOLD_MEDIUM, RISK_THRESHOLD_HIGH)
+    _RISK_LEVELS = ("low", "medium", "high", "critical")
+    
     # Logging
     LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+    VERBOSE = os.getenv("VERBOSE", "true").lower() in ("1", "true", "yes")  # Chat router progress output
     
     # Risk Actions Mapping
     RISK_ACTIONS = {
@@ -40,20 +94,36 @@ class Config:
     }
     
     @classmethod
-    def get_llm(cls):
-        """Get configured LLM instance."""
+    def get_llm(cls, model: Optional[str] = None):
+        """
+        Get configured LLM instance (shared across calls with the same settings).
+        
+        Args:
+            model: Model name overriding LLM_MODEL (e.g. the fast routing model)
+        """
+        api_key = cls.GOOGLE_API_KEY if cls.LLM_PROVIDER == "google" else cls.OPENAI_API_KEY
+        return _build_llm(cls.LLM_PROVIDER, model or cls.LLM_MODEL, cls.LLM_TEMPERATURE, api_key, _llm_cache())
+    
+    @classmethod
+    def get_fast_model(cls) -> str:
+        """Get the cheaper model used for medium-risk narratives when routing."""
+        if cls.LLM_MODEL_FAST:
+            return cls.LLM_MODEL_FAST
+        return "gemini-1.5-flash" if cls.LLM_PROVIDER == "google" else "gpt-4o-mini"
+    
+    @classmethod
+    def get_embeddings(cls):
+        """Get configured embeddings client for the semantic cache."""
         if cls.LLM_PROVIDER == "google":
-            from langchain_google_genai import ChatGoogleGenerativeAI
-            return ChatGoogleGenerativeAI(
-                model=cls.LLM_MODEL,
-                temperature=cls.LLM_TEMPERATURE,
+            from langchain_google_genai import GoogleGenerativeAIEmbeddings
+            return GoogleGenerativeAIEmbeddings(
+                model=cls.EMBEDDING_MODEL or "models/text-embedding-004",
                 google_api_key=cls.GOOGLE_API_KEY
             )
         else:  # openai
-            from langchain_openai import ChatOpenAI
-            return ChatOpenAI(
-                model=cls.LLM_MODEL,
-                temperature=cls.LLM_TEMPERATURE,
+            from langchain_openai import OpenAIEmbeddings
+            return OpenAIEmbeddings(
+                model=cls.EMBEDDING_MODEL or "text-embedding-3-small",
                 api_key=cls.OPENAI_API_KEY
             )
     
@@ -68,17 +138,31 @@ class Config:
     @classmethod
     def get_risk_level(cls, score: float) -> str:
         """Get risk level based on score."""
-        if score <= cls.RISK_THRESHOLD_LOW:
-            return "low"
-        elif score <= cls.RISK_THRESHOLD_MEDIUM:
-            return "medium"
-        elif score <= cls.RISK_THRESHOLD_HIGH:
-            return "high"
-        else:
-            return "critical"
+        return cls._RISK_LEVELS[bisect_left(cls._RISK_THRESHOLDS, score)]
     
     @classmethod
     def get_recommended_action(cls, score: float) -> str:
         """Get recommended action based on risk score."""
         risk_level = cls.get_risk_level(score)
         return cls.RISK_ACTIONS[risk_level]
+
+
+@lru_cache(maxsize=1)
+def _llm_cache():
+    """
+    Get the response cache shared by this application's LLM clients, built on first use.
+    
+    Identical prompts (same model and parameters) are answered from the cache
+    instead of making another API call. The memory cache is bounded by
+    LLM_CACHE_SIZE, evicting its oldest entries.
+    
+    Returns:
+        LangChain cache, or None when LLM_CACHE is "none"
+    """
+    if Config.LLM_CACHE == "sqlite":
+        from langchain_community.cache import SQLiteCache
+        return SQLiteCache(database_path=Config.LLM_CACHE_PATH)
+    if Config.LLM_CACHE == "memory":
+        from langchain_core.caches import InMemoryCache
+        return InMemoryCache(maxsize=Config.LLM_CACHE_SIZE)
+    return None
@@ -4,18 +4,23 @@ LangGraph workflow for the High-Risk Investigation Agent.
 This module defines the graph structure connecting all agent nodes.
 """
 
+from functools import lru_cache
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph, END
 from src.state import InvestigationState
 from src.agents.triage_agent import triage_agent
 from src.agents.analysis_agent import analysis_agent
-from src.agents.narrative_agent import narrative_agent
+from src.agents.narrative_agent import narrative_agent, anarrative_agent
 from src.agents.decision_agent import decision_agent
-from src.agents.chat_router import chat_router, route_from_chat
+from src.agents.chat_router import chat_router, chat_router_structured, route_from_chat
 
 
-def create_investigation_graph():
+def _build_graph(entry_node):
     """
-    Create the investigation workflow graph.
+    Build and compile the investigation workflow with the given entry node.
+    
+    Args:
+        entry_node: Node function for the "chat_router" entry point
     
     Returns:
         Compiled LangGraph StateGraph
@@ -24,10 +29,12 @@ def create_investigation_graph():
     workflow = StateGraph(InvestigationState)
     
     # Add nodes
-    workflow.add_node("chat_router", chat_router)
+    workflow.add_node("chat_router", entry_node)
     workflow.add_node("triage", triage_agent)
     workflow.add_node("analysis", analysis_agent)
-    workflow.add_node("narrative", narrative_agent)
+    # Sync and async implementations: invoke() uses the first, ainvoke()/abatch()
+    # the second so concurrent runs overlap their LLM calls
+    workflow.add_node("narrative", RunnableLambda(narrative_agent, afunc=anarrative_agent))
     workflow.add_node("decision", decision_agent)
     
     # Define edges
@@ -56,6 +63,35 @@ def create_investigation_graph():
     return app
 
 
+def create_investigation_graph():
+    """
+    Create the investigation workflow graph.
+    
+    This is the graph factory named in langgraph.json. It takes no arguments
+    because the LangGraph server passes its config to single-parameter
+    factories.
+    
+    Returns:
+        Compiled LangGraph StateGraph
+    """
+    return _build_graph(chat_router)
+
+
+@lru_cache(maxsize=1)
+def _structured_investigation_app():
+    """
+    Get the structured-input investigation graph, compiled on first use.
+    
+    Callers always supply entity_id/entity_type, so the entry node skips chat
+    parsing. The compiled graph is stateless between invocations, so one
+    instance serves every run_investigation call.
+    
+    Returns:
+        Compiled LangGraph StateGraph
+    """
+    return _build_graph(chat_router_structured)
+
+
 def run_investigation(entity_id: str, entity_type: str = "user"):
     """
     Run a complete investigation for an entity.
@@ -67,8 +103,8 @@ def run_investigation(entity_id: str, entity_type: str = "user"):
     Returns:
         Final investigation state with all results
     """
-    # Create the graph
-    app = create_investigation_graph()
+    # Reuse the compiled graph
+    app = _structured_investigation_app()
     
     # Initialize state
     initial_state = InvestigationState(
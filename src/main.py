@@ -73,7 +73,7 @@ Entity type: {args.entity_type}
             print(f"✅ Markdown report saved to: {args.output_md}")
         
         # Exit with appropriate code based on decision
-        recommendation = final_state.get('recommendation', {})
+        recommendation = final_state.get('recommendation') or {}
         if recommendation.get('requires_escalation'):
             print("\n⚠️  This case requires escalation to senior compliance officer.")
             sys.exit(2)
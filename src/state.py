@@ -7,7 +7,6 @@ in the investigation workflow.
 
 from typing import List, Dict, Any, Optional
 from langgraph.graph import MessagesState
-from datetime import datetime
 
 
 class InvestigationState(MessagesState):
@@ -5,75 +5,307 @@ These are mock implementations that simulate API calls and database lookups.
 In a production environment, these would be replaced with actual integrations.
 """
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple, TypedDict
 from datetime import datetime, timedelta
-import random
+import asyncio
+import hashlib
+import socket
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import numpy as np
 
 
-def seed_random(entity_id: str):
+# Shapes of the per-item records in the fetcher responses. They stay plain dicts:
+# downstream agents read them with .get(), they are embedded in pattern evidence
+# and reports, and LangGraph stores them in graph state.
+class LoginRecord(TypedDict):
+    timestamp: str
+    ip_address: str
+    device: str
+    location: str
+
+
+class ConnectionRecord(TypedDict):
+    account_id: str
+    relationship: str
+    confidence: float
+
+
+class FlagRecord(TypedDict):
+    flag_id: str
+    timestamp: str
+    flag_type: str
+    resolution: str
+    severity: str
+
+
+class TransactionRecord(TypedDict):
+    transaction_id: str
+    timestamp: str
+    amount: float
+    currency: str
+    type: str
+    recipient: str
+    status: str
+
+
+def _interned(*values: str) -> tuple:
+    """Build an option tuple of interned strings, shared by every generated record."""
+    return tuple(sys.intern(value) for value in values)
+
+
+_VERIFICATION_STATUSES = _interned("verified", "unverified", "pending")
+_COUNTRIES = _interned("US", "UK", "CA", "DE", "SG", "VN", "PH")
+_BOOLEANS = (True, False)
+_TRANSACTION_TYPES = _interned("gift_sent", "gift_received", "purchase", "cash_out", "deposit")
+_TRANSACTION_STATUSES = _interned("completed", "pending", "flagged")
+_DEVICES = _interned("iPhone", "Android", "Desktop", "iPad")
+_LOCATIONS = _interned("New York, US", "London, UK", "Singapore, SG", "Ho Chi Minh, VN", "Unknown")
+_RELATIONSHIPS = _interned("linked_email", "shared_device", "shared_ip", "transaction_partner")
+_FLAG_TYPES = _interned(
+    "suspicious_transaction_pattern",
+    "rapid_follow_unfollow",
+    "geographic_anomaly",
+    "high_value_cash_out",
+    "multiple_account_coordination"
+)
+_RESOLUTIONS = _interned("cleared", "warning_issued", "temporary_ban", "under_review")
+_SEVERITIES = _interned("low", "medium", "high")
+
+
+# Hardcoded demo entities (USER_001 low, USER_002 medium, USER_003 high risk).
+# Timestamps are stored as offsets and resolved against the fetch time.
+_DEMO_PROFILES = {
+    "USER_001": {"account_age_days": 500, "verification_status": "verified", "country": "US", "kyc_completed": True},
+    "USER_002": {"account_age_days": 120, "verification_status": "pending", "country": "VN", "kyc_completed": False},
+    "USER_003": {"account_age_days": 15, "verification_status": "unverified", "country": "Unknown", "kyc_completed": False},
+}
+
+# (flag_id, days_ago, flag_type, resolution, severity)
+_DEMO_FLAGS = {
+    "USER_001": {  # Low-risk: minimal flags
+        "flags": (),
+        "cleared_flags": 0,
+        "active_investigations": 0
+    },
+    "USER_002": {  # Medium-risk: some cleared flags
+        "flags": (
+            ("FLAG_12345", 90, "geographic_anomaly", "cleared", "low"),
+            ("FLAG_12346", 30, "rapid_follow_unfollow", "warning_issued", "medium"),
+        ),
+        "cleared_flags": 1,
+        "active_investigations": 0
+    },
+    "USER_003": {  # High-risk: multiple serious flags
+        "flags": (
+            ("FLAG_99001", 5, "multiple_account_coordination", "under_review", "high"),
+            ("FLAG_99002", 10, "high_value_cash_out", "temporary_ban", "high"),
+            ("FLAG_99003", 12, "suspicious_transaction_pattern", "under_review", "high"),
+            ("FLAG_99004", 14, "geographic_anomaly", "warning_issued", "medium"),
+        ),
+        "cleared_flags": 0,
+        "active_investigations": 2
+    },
+}
+
+# (transaction_id, hours_ago, amount, type, recipient, status)
+_DEMO_TRANSACTIONS = {
+    "USER_001": {  # Low-risk: normal activity
+        "transactions": (
+            ("TXN_100001", 48, 50.00, "purchase", "USER_5001", "completed"),
+            ("TXN_100002", 72, 25.00, "gift_sent", "USER_5002", "completed"),
+            ("TXN_100003", 120, 100.00, "deposit", "SYSTEM", "completed"),
+        ),
+        "total_transactions": 15,
+        "total_volume_usd": 450.00,
+        "last_24h_transactions": 0,
+        "last_24h_volume_usd": 0.00,
+        "avg_transaction_size": 30.00,
+        "cash_out_ratio": 0.0
+    },
+    "USER_002": {  # Medium-risk: moderate suspicious activity
+        "transactions": (
+            ("TXN_200001", 12, 500.00, "cash_out", "EXTERNAL", "completed"),
+            ("TXN_200002", 18, 200.00, "gift_sent", "USER_6001", "completed"),
+            ("TXN_200003", 20, 180.00, "gift_received", "USER_6001", "completed"),
+            ("TXN_200004", 24, 300.00, "purchase", "USER_6002", "completed"),
+        ),
+        "total_transactions": 35,
+        "total_volume_usd": 2500.00,
+        "last_24h_transactions": 4,
+        "last_24h_volume_usd": 1180.00,
+        "avg_transaction_size": 71.43,
+        "cash_out_ratio": 0.15
+    },
+    "USER_003": {  # High-risk: very suspicious activity
+        "transactions": (
+            ("TXN_300001", 2, 5000.00, "cash_out", "EXTERNAL", "flagged"),
+            ("TXN_300002", 4, 3500.00, "cash_out", "EXTERNAL", "completed"),
+            ("TXN_300003", 6, 1000.00, "gift_sent", "USER_7001", "completed"),
+            ("TXN_300004", 7, 950.00, "gift_received", "USER_7001", "completed"),
+            ("TXN_300005", 8, 1000.00, "gift_sent", "USER_7002", "completed"),
+            ("TXN_300006", 9, 980.00, "gift_received", "USER_7002", "completed"),
+        ),
+        "total_transactions": 50,
+        "total_volume_usd": 15000.00,
+        "last_24h_transactions": 6,
+        "last_24h_volume_usd": 12430.00,
+        "avg_transaction_size": 300.00,
+        "cash_out_ratio": 0.45
+    },
+}
+
+
+def _entity_seed(entity_id: str) -> int:
+    """
+    Convert entity_id to a consistent integer seed.
+    
+    Uses a 64-bit blake2b digest, which is stable across processes (unlike
+    hash()) and gives distinct seeds to ids that are anagrams of each other.
     """
-    Seed the random number generator based on entity_id for deterministic results.
+    return int.from_bytes(hashlib.blake2b(entity_id.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def seed_random(entity_id: str) -> np.random.Generator:
+    """
+    Create a random number generator seeded from entity_id for deterministic results.
     This ensures the same entity always gets the same mock data.
+    
+    Each call gets its own generator, so concurrent fetches neither share nor
+    touch any global random state.
+    """
+    return np.random.default_rng(_entity_seed(entity_id))
+
+
+def _choice(rng: np.random.Generator, options: tuple):
+    """Pick one element of options with rng, keeping its Python type."""
+    return options[rng.integers(len(options))]
+
+
+def _choices(rng: np.random.Generator, options: tuple, n: int) -> list:
+    """
+    Pick n elements of options with rng, in the same draw order as Generator.choice.
+    
+    The picks are the option objects themselves rather than numpy string copies.
     """
-    # Convert entity_id to a consistent integer seed
-    seed_value = sum(ord(c) for c in entity_id)
-    random.seed(seed_value)
+    return [options[i] for i in rng.integers(0, len(options), size=n).tolist()]
 
 
-def fetch_user_profile(entity_id: str) -> Dict[str, Any]:
+def _draw_txn_core(rng: np.random.Generator, n: int, n_types: int, n_statuses: int):
+    """
+    Draw the numeric transaction fields for n transactions.
+    
+    Type and status are returned as indices into the option lists, in the same
+    draw order as Generator.choice.
+    
+    Returns:
+        Tuple of (amounts, hours, txn_ids, type_idx, recipients, status_idx) arrays
+    """
+    amounts = np.round(rng.uniform(10, 5000, size=n), 2)
+    hours = rng.integers(1, 721, size=n)
+    txn_ids = rng.integers(100000, 1000000, size=n)
+    type_idx = rng.integers(0, n_types, size=n)
+    recipients = rng.integers(1000, 10000, size=n)
+    status_idx = rng.integers(0, n_statuses, size=n)
+    return amounts, hours, txn_ids, type_idx, recipients, status_idx
+
+
+def _offset_timestamps(now: datetime, offsets: np.ndarray, unit: str) -> List[str]:
+    """
+    Format now minus each offset as an ISO 8601 string in one numpy call.
+    
+    Args:
+        now: Reference time
+        offsets: Integer offsets to subtract from now
+        unit: numpy timedelta unit of the offsets ('h' or 'D')
+        
+    Returns:
+        ISO timestamps at microsecond precision
+    """
+    times = np.datetime64(now, 'us') - offsets.astype(f'timedelta64[{unit}]')
+    return np.datetime_as_string(times, unit='us').tolist()
+
+
+def _ip_strings(octets: np.ndarray) -> List[str]:
+    """
+    Format rows of four octets as dotted IPv4 addresses.
+    
+    Packs the octets into bytes once and lets socket.inet_ntoa format each
+    address in C.
+    """
+    packed = octets.astype(np.uint8).tobytes()
+    return [socket.inet_ntoa(packed[i:i + 4]) for i in range(0, len(packed), 4)]
+
+
+# Shared pool for the independent source lookups in gather_all_data
+_FETCH_EXECUTOR = ThreadPoolExecutor(max_workers=5, thread_name_prefix="fetch")
+
+# The random draws are deterministic per entity, so they are memoized. Only
+# time-independent values are cached (timestamps are kept as offsets), and the
+# fetchers resolve them against the current time and build fresh dicts on
+# every call, so long-running processes never serve stale timestamps or
+# velocity counts and callers may modify what they receive.
+_FETCH_CACHE_SIZE = 1024
+
+
+def _frozen(array: np.ndarray) -> np.ndarray:
+    """Mark a cached draw array read-only so no caller can alter it."""
+    array.flags.writeable = False
+    return array
+
+
+@lru_cache(maxsize=_FETCH_CACHE_SIZE)
+def _draw_profile(entity_id: str) -> Tuple[int, str, str, bool]:
+    """
+    Draw the mock profile fields for a non-demo entity.
+    
+    Returns:
+        Tuple of (registration_days_ago, verification_status, country, kyc_completed)
+    """
+    rng = seed_random(entity_id)
+    registration_days_ago = int(rng.integers(30, 731))
+    return (
+        registration_days_ago,
+        _choice(rng, _VERIFICATION_STATUSES),
+        _choice(rng, _COUNTRIES),
+        _choice(rng, _BOOLEANS),
+    )
+
+
+def fetch_user_profile(entity_id: str, now: Optional[datetime] = None) -> Dict[str, Any]:
     """
     Fetch user profile information.
     
     Args:
         entity_id: The user ID to look up
+        now: Reference time for timestamps (defaults to the current time)
         
     Returns:
         User profile data including account details and verification status
     """
+    # One reference time for every timestamp in this response
+    if now is None:
+        now = datetime.now()
+    
     # Demo entities with hardcoded profiles
-    if entity_id == "USER_001":  # Low-risk profile
+    demo = _DEMO_PROFILES.get(entity_id)
+    if demo is not None:
         return {
             "user_id": entity_id,
             "username": f"user_{entity_id}",
             "email": f"{entity_id}@example.com",
-            "registration_date": (datetime.now() - timedelta(days=500)).isoformat(),
-            "account_age_days": 500,
-            "verification_status": "verified",
-            "country": "US",
+            "registration_date": (now - timedelta(days=demo["account_age_days"])).isoformat(),
+            "account_age_days": demo["account_age_days"],
+            "verification_status": demo["verification_status"],
+            "country": demo["country"],
             "account_status": "active",
-            "kyc_completed": True
+            "kyc_completed": demo["kyc_completed"]
         }
-    elif entity_id == "USER_002":  # Medium-risk profile
-        return {
-            "user_id": entity_id,
-            "username": f"user_{entity_id}",
-            "email": f"{entity_id}@example.com",
-            "registration_date": (datetime.now() - timedelta(days=120)).isoformat(),
-            "account_age_days": 120,
-            "verification_status": "pending",
-            "country": "VN",
-            "account_status": "active",
-            "kyc_completed": False
-        }
-    elif entity_id == "USER_003":  # High-risk profile
-        return {
-            "user_id": entity_id,
-            "username": f"user_{entity_id}",
-            "email": f"{entity_id}@example.com",
-            "registration_date": (datetime.now() - timedelta(days=15)).isoformat(),
-            "account_age_days": 15,
-            "verification_status": "unverified",
-            "country": "Unknown",
-            "account_status": "active",
-            "kyc_completed": False
-        }
-    
-    # Seed random for deterministic results
-    seed_random(entity_id)
     
     # Mock data - replace with actual API call
-    registration_days_ago = random.randint(30, 730)
-    registration_date = datetime.now() - timedelta(days=registration_days_ago)
+    registration_days_ago, verification_status, country, kyc_completed = _draw_profile(entity_id)
+    registration_date = now - timedelta(days=registration_days_ago)
     
     return {
         "user_id": entity_id,
@@ -81,288 +313,373 @@ def fetch_user_profile(entity_id: str) -> Dict[str, Any]:
         "email": f"{entity_id}@example.com",
         "registration_date": registration_date.isoformat(),
         "account_age_days": registration_days_ago,
-        "verification_status": random.choice(["verified", "unverified", "pending"]),
-        "country": random.choice(["US", "UK", "CA", "DE", "SG", "VN", "PH"]),
+        "verification_status": verification_status,
+        "country": country,
         "account_status": "active",
-        "kyc_completed": random.choice([True, False])
+        "kyc_completed": kyc_completed
     }
 
 
-def fetch_activity_logs(entity_id: str) -> Dict[str, Any]:
+@lru_cache(maxsize=_FETCH_CACHE_SIZE)
+def _draw_activity(entity_id: str) -> Tuple[int, int, np.ndarray, tuple, tuple, tuple, bool]:
+    """
+    Draw the mock activity fields for an entity.
+    
+    Returns:
+        Tuple of (num_logins, num_transactions, login hour offsets, ip addresses,
+        devices, locations, vpn_usage_detected)
+    """
+    rng = seed_random(entity_id)
+    
+    # Mock data - simulate various activity patterns
+    num_logins = int(rng.integers(5, 51))
+    num_transactions = int(rng.integers(0, 101))
+    
+    # Generate login history, drawing each field for all logins at once
+    n = min(num_logins, 10)  # Last 10 logins
+    hours = rng.integers(1, 721, size=n)
+    octets = rng.integers(1, 256, size=(n, 4))
+    devices = _choices(rng, _DEVICES, n)
+    locations = _choices(rng, _LOCATIONS, n)
+    
+    return (
+        num_logins,
+        num_transactions,
+        _frozen(hours),
+        tuple(_ip_strings(octets)),
+        tuple(devices),
+        tuple(locations),
+        _choice(rng, _BOOLEANS),
+    )
+
+
+def fetch_activity_logs(entity_id: str, now: Optional[datetime] = None) -> Dict[str, Any]:
     """
     Fetch recent activity logs for the user.
     
     Args:
         entity_id: The user ID to look up
+        now: Reference time for timestamps (defaults to the current time)
         
     Returns:
         Activity data including logins, transactions, and device information
     """
-    # Seed random for deterministic results
-    seed_random(entity_id)
+    # One reference time for every timestamp in this response
+    if now is None:
+        now = datetime.now()
     
-    # Mock data - simulate various activity patterns
-    num_logins = random.randint(5, 50)
-    num_transactions = random.randint(0, 100)
-    
-    # Generate login history
-    logins = []
-    for i in range(min(num_logins, 10)):  # Last 10 logins
-        login_time = datetime.now() - timedelta(hours=random.randint(1, 720))
-        logins.append({
-            "timestamp": login_time.isoformat(),
-            "ip_address": f"{random.randint(1, 255)}.{random.randint(1, 255)}.{random.randint(1, 255)}.{random.randint(1, 255)}",
-            "device": random.choice(["iPhone", "Android", "Desktop", "iPad"]),
-            "location": random.choice(["New York, US", "London, UK", "Singapore, SG", "Ho Chi Minh, VN", "Unknown"])
-        })
+    num_logins, num_transactions, hours, ip_addresses, devices, locations, vpn = _draw_activity(entity_id)
+    
+    logins: List[LoginRecord] = [
+        {
+            "timestamp": timestamp,
+            "ip_address": ip_address,
+            "device": device,
+            "location": location
+        }
+        for timestamp, ip_address, device, location in zip(
+            _offset_timestamps(now, hours, 'h'), ip_addresses, devices, locations
+        )
+    ]
     
     return {
         "total_logins": num_logins,
         "total_transactions": num_transactions,
         "recent_logins": logins,
-        "vpn_usage_detected": random.choice([True, False]),
-        "multiple_devices": len(set(login["device"] for login in logins)) > 2,
-        "geographic_spread": len(set(login["location"] for login in logins))
+        "vpn_usage_detected": vpn,
+        "multiple_devices": len(set(devices)) > 2,
+        "geographic_spread": len(set(locations))
     }
 
 
-def fetch_connected_accounts(entity_id: str) -> Dict[str, Any]:
+@lru_cache(maxsize=_FETCH_CACHE_SIZE)
+def _draw_connections(entity_id: str) -> Tuple[int, tuple, int, int, int]:
+    """
+    Draw the mock social graph fields for an entity.
+    
+    Returns:
+        Tuple of (num_connections, (account_id, relationship, confidence) rows,
+        follows, followers, mutual_follows)
+    """
+    rng = seed_random(entity_id)
+    
+    num_connections = int(rng.integers(0, 21))
+    
+    n = min(num_connections, 5)  # Show up to 5 connections
+    account_ids = rng.integers(1000, 10000, size=n).tolist()
+    relationships = _choices(rng, _RELATIONSHIPS, n)
+    confidences = rng.uniform(0.5, 1.0, size=n).tolist()
+    
+    return (
+        num_connections,
+        tuple(zip((f"ACC_{account_id}" for account_id in account_ids), relationships, confidences)),
+        int(rng.integers(0, 1001)),
+        int(rng.integers(0, 1001)),
+        int(rng.integers(0, 101)),
+    )
+
+
+def fetch_connected_accounts(entity_id: str, now: Optional[datetime] = None) -> Dict[str, Any]:
     """
     Fetch connected accounts and social graph.
     
     Args:
         entity_id: The user ID to look up
+        now: Unused (the social graph has no timestamps); accepted so every
+            fetcher takes the same arguments
         
     Returns:
         Connected accounts and relationship data
     """
-    # Seed random for deterministic results
-    seed_random(entity_id)
-    
-    num_connections = random.randint(0, 20)
+    num_connections, rows, follows, followers, mutual_follows = _draw_connections(entity_id)
     
-    connections = []
-    for i in range(min(num_connections, 5)):  # Show up to 5 connections
-        connections.append({
-            "account_id": f"ACC_{random.randint(1000, 9999)}",
-            "relationship": random.choice(["linked_email", "shared_device", "shared_ip", "transaction_partner"]),
-            "confidence": random.uniform(0.5, 1.0)
-        })
+    connections: List[ConnectionRecord] = [
+        {
+            "account_id": account_id,
+            "relationship": relationship,
+            "confidence": confidence
+        }
+        for account_id, relationship, confidence in rows
+    ]
     
     return {
         "total_connections": num_connections,
         "linked_accounts": connections,
-        "follows": random.randint(0, 1000),
-        "followers": random.randint(0, 1000),
-        "mutual_follows": random.randint(0, 100)
+        "follows": follows,
+        "followers": followers,
+        "mutual_follows": mutual_follows
     }
 
 
-def fetch_past_flags(entity_id: str) -> Dict[str, Any]:
+@lru_cache(maxsize=_FETCH_CACHE_SIZE)
+def _draw_flags(entity_id: str) -> Tuple[np.ndarray, tuple, tuple, tuple, tuple]:
+    """
+    Draw the mock flag history for a non-demo entity.
+    
+    Returns:
+        Tuple of (day offsets, flag ids, flag types, resolutions, severities)
+    """
+    rng = seed_random(entity_id)
+    
+    num_flags = int(rng.integers(0, 6))
+    
+    days = rng.integers(1, 366, size=num_flags)
+    flag_ids = rng.integers(10000, 100000, size=num_flags).tolist()
+    flag_types = _choices(rng, _FLAG_TYPES, num_flags)
+    resolutions = _choices(rng, _RESOLUTIONS, num_flags)
+    severities = _choices(rng, _SEVERITIES, num_flags)
+    
+    return (
+        _frozen(days),
+        tuple(f"FLAG_{flag_id}" for flag_id in flag_ids),
+        tuple(flag_types),
+        tuple(resolutions),
+        tuple(severities),
+    )
+
+
+def fetch_past_flags(entity_id: str, now: Optional[datetime] = None) -> Dict[str, Any]:
     """
     Fetch past flags and investigation history.
     
     Args:
         entity_id: The user ID to look up
+        now: Reference time for timestamps (defaults to the current time)
         
     Returns:
         Historical alert and investigation data
     """
-    # Seed random for deterministic results
-    seed_random(entity_id)
+    # One reference time for every timestamp in this response
+    if now is None:
+        now = datetime.now()
     
     # Demo entities with hardcoded flags
-    if entity_id == "USER_001":  # Low-risk: minimal flags
-        return {
-            "total_flags": 0,
-            "past_flags": [],
-            "cleared_flags": 0,
-            "active_investigations": 0
-        }
-    elif entity_id == "USER_002":  # Medium-risk: some cleared flags
-        return {
-            "total_flags": 2,
-            "past_flags": [
-                {
-                    "flag_id": "FLAG_12345",
-                    "timestamp": (datetime.now() - timedelta(days=90)).isoformat(),
-                    "flag_type": "geographic_anomaly",
-                    "resolution": "cleared",
-                    "severity": "low"
-                },
-                {
-                    "flag_id": "FLAG_12346",
-                    "timestamp": (datetime.now() - timedelta(days=30)).isoformat(),
-                    "flag_type": "rapid_follow_unfollow",
-                    "resolution": "warning_issued",
-                    "severity": "medium"
-                }
-            ],
-            "cleared_flags": 1,
-            "active_investigations": 0
-        }
-    elif entity_id == "USER_003":  # High-risk: multiple serious flags
+    demo = _DEMO_FLAGS.get(entity_id)
+    if demo is not None:
         return {
-            "total_flags": 4,
+            "total_flags": len(demo["flags"]),
             "past_flags": [
                 {
-                    "flag_id": "FLAG_99001",
-                    "timestamp": (datetime.now() - timedelta(days=5)).isoformat(),
-                    "flag_type": "multiple_account_coordination",
-                    "resolution": "under_review",
-                    "severity": "high"
-                },
-                {
-                    "flag_id": "FLAG_99002",
-                    "timestamp": (datetime.now() - timedelta(days=10)).isoformat(),
-                    "flag_type": "high_value_cash_out",
-                    "resolution": "temporary_ban",
-                    "severity": "high"
-                },
-                {
-                    "flag_id": "FLAG_99003",
-                    "timestamp": (datetime.now() - timedelta(days=12)).isoformat(),
-                    "flag_type": "suspicious_transaction_pattern",
-                    "resolution": "under_review",
-                    "severity": "high"
-                },
-                {
-                    "flag_id": "FLAG_99004",
-                    "timestamp": (datetime.now() - timedelta(days=14)).isoformat(),
-                    "flag_type": "geographic_anomaly",
-                    "resolution": "warning_issued",
-                    "severity": "medium"
+                    "flag_id": flag_id,
+                    "timestamp": (now - timedelta(days=days_ago)).isoformat(),
+                    "flag_type": flag_type,
+                    "resolution": resolution,
+                    "severity": severity
                 }
+                for flag_id, days_ago, flag_type, resolution, severity in demo["flags"]
             ],
-            "cleared_flags": 0,
-            "active_investigations": 2
+            "cleared_flags": demo["cleared_flags"],
+            "active_investigations": demo["active_investigations"]
         }
     
-    num_flags = random.randint(0, 5)
-    
-    flags = []
-    for i in range(num_flags):
-        flag_time = datetime.now() - timedelta(days=random.randint(1, 365))
-        flags.append({
-            "flag_id": f"FLAG_{random.randint(10000, 99999)}",
-            "timestamp": flag_time.isoformat(),
-            "flag_type": random.choice([
-                "suspicious_transaction_pattern",
-                "rapid_follow_unfollow",
-                "geographic_anomaly",
-                "high_value_cash_out",
-                "multiple_account_coordination"
-            ]),
-            "resolution": random.choice(["cleared", "warning_issued", "temporary_ban", "under_review"]),
-            "severity": random.choice(["low", "medium", "high"])
-        })
+    days, flag_ids, flag_types, resolutions, severities = _draw_flags(entity_id)
+    
+    flags: List[FlagRecord] = [
+        {
+            "flag_id": flag_id,
+            "timestamp": timestamp,
+            "flag_type": flag_type,
+            "resolution": resolution,
+            "severity": severity
+        }
+        for flag_id, timestamp, flag_type, resolution, severity in zip(
+            flag_ids, _offset_timestamps(now, days, 'D'), flag_types, resolutions, severities
+        )
+    ]
     
     return {
-        "total_flags": num_flags,
+        "total_flags": len(flag_ids),
         "past_flags": flags,
-        "cleared_flags": sum(1 for f in flags if f["resolution"] == "cleared"),
-        "active_investigations": sum(1 for f in flags if f["resolution"] == "under_review")
+        "cleared_flags": resolutions.count("cleared"),
+        "active_investigations": resolutions.count("under_review")
     }
 
 
-def fetch_transactions(entity_id: str) -> Dict[str, Any]:
+@lru_cache(maxsize=_FETCH_CACHE_SIZE)
+def _draw_transactions(entity_id: str) -> Tuple[int, np.ndarray, np.ndarray, tuple, tuple, tuple, tuple]:
+    """
+    Draw the mock transaction history for a non-demo entity.
+    
+    Returns:
+        Tuple of (num_transactions, amounts, hour offsets, transaction ids,
+        types, recipients, statuses)
+    """
+    # Draw all transaction fields in one vectorized pass
+    rng = seed_random(entity_id)
+    num_transactions = int(rng.integers(10, 101))
+    n = min(num_transactions, 20)  # Last 20 transactions
+    
+    amounts, hours, txn_ids, type_idx, recipients, status_idx = _draw_txn_core(
+        rng, n, len(_TRANSACTION_TYPES), len(_TRANSACTION_STATUSES)
+    )
+    
+    return (
+        num_transactions,
+        _frozen(amounts),
+        _frozen(hours),
+        tuple(f"TXN_{txn_id}" for txn_id in txn_ids.tolist()),
+        tuple(_TRANSACTION_TYPES[i] for i in type_idx.tolist()),
+        tuple(f"USER_{recipient}" for recipient in recipients.tolist()),
+        tuple(_TRANSACTION_STATUSES[i] for i in status_idx.tolist()),
+    )
+
+
+def fetch_transactions(entity_id: str, now: Optional[datetime] = None) -> Dict[str, Any]:
     """
     Fetch transaction history.
     
     Args:
         entity_id: The user ID to look up
+        now: Reference time for timestamps (defaults to the current time)
         
     Returns:
         Transaction data with amounts, recipients, and patterns
     """
-    # Seed random for deterministic results
-    seed_random(entity_id)
+    # One reference time for every timestamp in this response
+    if now is None:
+        now = datetime.now()
     
     # Demo entities with hardcoded transactions
-    if entity_id == "USER_001":  # Low-risk: normal activity
-        transactions = [
-            {"transaction_id": "TXN_100001", "timestamp": (datetime.now() - timedelta(hours=48)).isoformat(), "amount": 50.00, "currency": "USD", "type": "purchase", "recipient": "USER_5001", "status": "completed"},
-            {"transaction_id": "TXN_100002", "timestamp": (datetime.now() - timedelta(hours=72)).isoformat(), "amount": 25.00, "currency": "USD", "type": "gift_sent", "recipient": "USER_5002", "status": "completed"},
-            {"transaction_id": "TXN_100003", "timestamp": (datetime.now() - timedelta(hours=120)).isoformat(), "amount": 100.00, "currency": "USD", "type": "deposit", "recipient": "SYSTEM", "status": "completed"},
-        ]
+    demo = _DEMO_TRANSACTIONS.get(entity_id)
+    if demo is not None:
         return {
-            "total_transactions": 15,
-            "recent_transactions": transactions,
-            "total_volume_usd": 450.00,
-            "last_24h_transactions": 0,
-            "last_24h_volume_usd": 0.00,
-            "avg_transaction_size": 30.00,
-            "cash_out_ratio": 0.0
-        }
-    elif entity_id == "USER_002":  # Medium-risk: moderate suspicious activity
-        transactions = [
-            {"transaction_id": "TXN_200001", "timestamp": (datetime.now() - timedelta(hours=12)).isoformat(), "amount": 500.00, "currency": "USD", "type": "cash_out", "recipient": "EXTERNAL", "status": "completed"},
-            {"transaction_id": "TXN_200002", "timestamp": (datetime.now() - timedelta(hours=18)).isoformat(), "amount": 200.00, "currency": "USD", "type": "gift_sent", "recipient": "USER_6001", "status": "completed"},
-            {"transaction_id": "TXN_200003", "timestamp": (datetime.now() - timedelta(hours=20)).isoformat(), "amount": 180.00, "currency": "USD", "type": "gift_received", "recipient": "USER_6001", "status": "completed"},
-            {"transaction_id": "TXN_200004", "timestamp": (datetime.now() - timedelta(hours=24)).isoformat(), "amount": 300.00, "currency": "USD", "type": "purchase", "recipient": "USER_6002", "status": "completed"},
-        ]
-        return {
-            "total_transactions": 35,
-            "recent_transactions": transactions,
-            "total_volume_usd": 2500.00,
-            "last_24h_transactions": 4,
-            "last_24h_volume_usd": 1180.00,
-            "avg_transaction_size": 71.43,
-            "cash_out_ratio": 0.15
-        }
-    elif entity_id == "USER_003":  # High-risk: very suspicious activity
-        transactions = [
-            {"transaction_id": "TXN_300001", "timestamp": (datetime.now() - timedelta(hours=2)).isoformat(), "amount": 5000.00, "currency": "USD", "type": "cash_out", "recipient": "EXTERNAL", "status": "flagged"},
-            {"transaction_id": "TXN_300002", "timestamp": (datetime.now() - timedelta(hours=4)).isoformat(), "amount": 3500.00, "currency": "USD", "type": "cash_out", "recipient": "EXTERNAL", "status": "completed"},
-            {"transaction_id": "TXN_300003", "timestamp": (datetime.now() - timedelta(hours=6)).isoformat(), "amount": 1000.00, "currency": "USD", "type": "gift_sent", "recipient": "USER_7001", "status": "completed"},
-            {"transaction_id": "TXN_300004", "timestamp": (datetime.now() - timedelta(hours=7)).isoformat(), "amount": 950.00, "currency": "USD", "type": "gift_received", "recipient": "USER_7001", "status": "completed"},
-            {"transaction_id": "TXN_300005", "timestamp": (datetime.now() - timedelta(hours=8)).isoformat(), "amount": 1000.00, "currency": "USD", "type": "gift_sent", "recipient": "USER_7002", "status": "completed"},
-            {"transaction_id": "TXN_300006", "timestamp": (datetime.now() - timedelta(hours=9)).isoformat(), "amount": 980.00, "currency": "USD", "type": "gift_received", "recipient": "USER_7002", "status": "completed"},
-        ]
-        return {
-            "total_transactions": 50,
-            "recent_transactions": transactions,
-            "total_volume_usd": 15000.00,
-            "last_24h_transactions": 6,
-            "last_24h_volume_usd": 12430.00,
-            "avg_transaction_size": 300.00,
-            "cash_out_ratio": 0.45
+            "total_transactions": demo["total_transactions"],
+            "recent_transactions": [
+                {
+                    "transaction_id": txn_id,
+                    "timestamp": (now - timedelta(hours=hours_ago)).isoformat(),
+                    "amount": amount,
+                    "currency": "USD",
+                    "type": txn_type,
+                    "recipient": recipient,
+                    "status": status
+                }
+                for txn_id, hours_ago, amount, txn_type, recipient, status in demo["transactions"]
+            ],
+            "total_volume_usd": demo["total_volume_usd"],
+            "last_24h_transactions": demo["last_24h_transactions"],
+            "last_24h_volume_usd": demo["last_24h_volume_usd"],
+            "avg_transaction_size": demo["avg_transaction_size"],
+            "cash_out_ratio": demo["cash_out_ratio"]
         }
     
-    num_transactions = random.randint(10, 100)
-    
-    # Generate recent transactions
-    transactions = []
-    total_volume = 0
+    num_transactions, amounts, hours, txn_ids, types, recipients, statuses = _draw_transactions(entity_id)
     
-    for i in range(min(num_transactions, 20)):  # Last 20 transactions
-        amount = random.uniform(10, 5000)
-        total_volume += amount
-        trans_time = datetime.now() - timedelta(hours=random.randint(1, 720))
-        
-        transactions.append({
-            "transaction_id": f"TXN_{random.randint(100000, 999999)}",
-            "timestamp": trans_time.isoformat(),
-            "amount": round(amount, 2),
+    transactions: List[TransactionRecord] = [
+        {
+            "transaction_id": txn_id,
+            "timestamp": timestamp,
+            "amount": amount,
             "currency": "USD",
-            "type": random.choice(["gift_sent", "gift_received", "purchase", "cash_out", "deposit"]),
-            "recipient": f"USER_{random.randint(1000, 9999)}",
-            "status": random.choice(["completed", "pending", "flagged"])
-        })
+            "type": txn_type,
+            "recipient": recipient,
+            "status": status
+        }
+        for txn_id, timestamp, amount, txn_type, recipient, status in zip(
+            txn_ids, _offset_timestamps(now, hours, 'h'), amounts.tolist(),
+            types, recipients, statuses
+        )
+    ]
+    total_volume = amounts.sum()
     
-    # Calculate velocity metrics
-    last_24h_transactions = [t for t in transactions if 
-                             datetime.fromisoformat(t["timestamp"]) > datetime.now() - timedelta(hours=24)]
-    last_24h_volume = sum(t["amount"] for t in last_24h_transactions)
+    # Velocity metrics from the offsets, resolved against this call's time
+    last_24h = hours < 24
     
     return {
         "total_transactions": num_transactions,
         "recent_transactions": transactions,
-        "total_volume_usd": round(total_volume, 2),
-        "last_24h_transactions": len(last_24h_transactions),
-        "last_24h_volume_usd": round(last_24h_volume, 2),
-        "avg_transaction_size": round(total_volume / num_transactions, 2) if num_transactions > 0 else 0,
-        "cash_out_ratio": sum(1 for t in transactions if t["type"] == "cash_out") / len(transactions) if transactions else 0
+        "total_volume_usd": round(float(total_volume), 2),
+        "last_24h_transactions": int(last_24h.sum()),
+        "last_24h_volume_usd": round(float(amounts[last_24h].sum()), 2),
+        "avg_transaction_size": round(float(total_volume) / num_transactions, 2),
+        "cash_out_ratio": types.count("cash_out") / len(types)
+    }
+
+
+# Package key and fetcher for each user data source, in query order
+_USER_SOURCES = (
+    ("profile", fetch_user_profile),
+    ("activity", fetch_activity_logs),
+    ("connections", fetch_connected_accounts),
+    ("flags", fetch_past_flags),
+    ("transactions", fetch_transactions),
+)
+
+
+def _user_data_package(results: List[Dict[str, Any]], now: datetime) -> Dict[str, Any]:
+    """
+    Assemble the user data package from the per-source results.
+    
+    Args:
+        results: Fetcher results in _USER_SOURCES order
+        now: Reference time the sources were queried with
+        
+    Returns:
+        Comprehensive data package from all sources
+    """
+    package = {key: result for (key, _), result in zip(_USER_SOURCES, results)}
+    package["data_sources"] = ["user_db", "activity_logs", "social_graph", "flag_history", "transaction_db"]
+    package["query_timestamp"] = now.isoformat()
+    return package
+
+
+def _basic_data_package(entity_id: str, entity_type: str, now: datetime) -> Dict[str, Any]:
+    """
+    Build the basic mock data package for non-user entities.
+    
+    Args:
+        entity_id: The entity ID to investigate
+        entity_type: Type of entity (transaction/account)
+        now: Query time
+        
+    Returns:
+        Basic data package
+    """
+    return {
+        "entity_type": entity_type,
+        "entity_id": entity_id,
+        "data": "Mock data for non-user entities",
+        "query_timestamp": now.isoformat()
     }
 
 
@@ -377,21 +694,41 @@ def gather_all_data(entity_id: str, entity_type: str) -> Dict[str, Any]:
     Returns:
         Comprehensive data package from all sources
     """
+    # One reference time for every source, so timestamps agree across the package
+    now = datetime.now()
+    
     if entity_type == "user":
-        return {
-            "profile": fetch_user_profile(entity_id),
-            "activity": fetch_activity_logs(entity_id),
-            "connections": fetch_connected_accounts(entity_id),
-            "flags": fetch_past_flags(entity_id),
-            "transactions": fetch_transactions(entity_id),
-            "data_sources": ["user_db", "activity_logs", "social_graph", "flag_history", "transaction_db"],
-            "query_timestamp": datetime.now().isoformat()
-        }
+        # The sources are independent, so query them concurrently
+        futures = [_FETCH_EXECUTOR.submit(fetch, entity_id, now) for _, fetch in _USER_SOURCES]
+        return _user_data_package([future.result() for future in futures], now)
     else:
         # For other entity types, return basic mock data
-        return {
-            "entity_type": entity_type,
-            "entity_id": entity_id,
-            "data": "Mock data for non-user entities",
-            "query_timestamp": datetime.now().isoformat()
-        }
+        return _basic_data_package(entity_id, entity_type, now)
+
+
+async def gather_all_data_async(entity_id: str, entity_type: str) -> Dict[str, Any]:
+    """
+    Async variant of gather_all_data for event-loop callers.
+    
+    The fetchers run concurrently on the shared fetch pool while the event
+    loop stays free.
+    
+    Args:
+        entity_id: The entity ID to investigate
+        entity_type: Type of entity (user/transaction/account)
+        
+    Returns:
+        Comprehensive data package from all sources
+    """
+    # One reference time for every source, so timestamps agree across the package
+    now = datetime.now()
+    
+    if entity_type == "user":
+        loop = asyncio.get_running_loop()
+        results = await asyncio.gather(*(
+            loop.run_in_executor(_FETCH_EXECUTOR, fetch, entity_id, now) for _, fetch in _USER_SOURCES
+        ))
+        return _user_data_package(results, now)
+    else:
+        # For other entity types, return basic mock data
+        return _basic_data_package(entity_id, entity_type, now)
@@ -2,82 +2,243 @@
 Output formatting utilities for investigation reports.
 """
 
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 import json
+import os
+import tempfile
+from dataclasses import dataclass
 from datetime import datetime
+from functools import lru_cache
+from jinja2 import Environment
 
+try:
+    import orjson
+except ImportError:  # Fall back to the standard library encoder
+    orjson = None
 
-def format_terminal_report(final_state: Dict[str, Any]) -> str:
-    """
-    Format investigation results for terminal display.
-    
-    Args:
-        final_state: Final investigation state
-        
-    Returns:
-        Formatted string for terminal output
-    """
-    entity_id = final_state.get('entity_id', 'N/A')
-    risk_score = final_state.get('risk_score', 0)
-    patterns = final_state.get('detected_patterns', [])
-    narrative = final_state.get('narrative', '')
-    recommendation = final_state.get('recommendation', {})
-    
-    output = f"""
-{'='*70}
+
+_SEP = '=' * 70
+
+
+@lru_cache(maxsize=64)
+def _titleize(name: str) -> str:
+    """Turn a snake_case pattern type into a display title (few distinct values, so cached)."""
+    return name.replace('_', ' ').title()
+
+
+_TERMINAL_TEMPLATE_SRC = """
+{{ sep }}
 INVESTIGATION REPORT
-{'='*70}
+{{ sep }}
 
-Entity ID: {entity_id}
-Investigation Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+Entity ID: {{ view.entity_id }}
+Investigation Date: {{ view.timestamp.strftime('%Y-%m-%d %H:%M:%S') }}
 
-{'='*70}
+{{ sep }}
 RISK ASSESSMENT
-{'='*70}
+{{ sep }}
 
-Risk Score: {risk_score:.1f}/100
-Risk Level: {recommendation.get('risk_level', 'N/A').upper()}
-Patterns Detected: {len(patterns)}
+Risk Score: {{ '%.1f'|format(view.risk_score) }}/100
+Risk Level: {{ view.risk_level.upper() }}
+Patterns Detected: {{ view.patterns|length }}
 
 Detected Patterns:
-"""
-    
-    if patterns:
-        for i, pattern in enumerate(patterns, 1):
-            output += f"\n  {i}. {pattern['pattern_type'].replace('_', ' ').title()}"
-            output += f"\n     Severity: {pattern['severity'].upper()}"
-            output += f"\n     {pattern['description']}\n"
-    else:
-        output += "\n  No suspicious patterns detected\n"
-    
-    output += f"""
-{'='*70}
+{% for pattern in view.patterns %}
+
+  {{ loop.index }}. {{ pattern['pattern_type']|titleize }}
+     Severity: {{ pattern['severity'].upper() }}
+     {{ pattern['description'] }}
+{% else %}
+
+  No suspicious patterns detected
+{% endfor %}
+
+{{ sep }}
 INVESTIGATION NARRATIVE
-{'='*70}
+{{ sep }}
 
-{narrative}
+{{ view.narrative }}
 
-{'='*70}
+{{ sep }}
 FINAL RECOMMENDATION
-{'='*70}
+{{ sep }}
+
+Decision: {{ view.decision.upper() }}
+Confidence: {{ view.confidence }}%
+Requires Escalation: {{ 'YES' if view.requires_escalation else 'NO' }}
+
+{% if view.justification is not none %}
+Justification:
+{{ view.justification }}
+
+{% endif %}
+{% if view.next_steps is not none %}
+Next Steps:
+{% for step in view.next_steps %}
+  • {{ step }}
+{% endfor %}
+{% endif %}
+
+{{ sep }}
+"""
+
+_MD_TEMPLATE_SRC = """# Investigation Report: {{ view.entity_id }}
 
-Decision: {recommendation.get('decision', 'N/A').upper()}
-Confidence: {recommendation.get('confidence', 0)}%
-Requires Escalation: {'YES' if recommendation.get('requires_escalation') else 'NO'}
+**Date:** {{ view.timestamp.strftime('%Y-%m-%d %H:%M:%S') }}
 
+## Executive Summary
+
+- **Entity ID:** {{ view.entity_id }}
+- **Risk Score:** {{ '%.1f'|format(view.risk_score) }}/100
+- **Risk Level:** {{ view.risk_level.upper() }}
+- **Decision:** {{ view.decision.upper() }}
+- **Patterns Detected:** {{ view.patterns|length }}
+
+## Risk Assessment
+
+### Detected Patterns
+
+{% for pattern in view.patterns %}
+
+#### {{ pattern['pattern_type']|titleize }}
+- **Severity:** {{ pattern['severity'].upper() }}
+- **Description:** {{ pattern['description'] }}
+- **Evidence:** {{ pattern.get('evidence', {}) }}
+
+{% else %}
+No suspicious patterns detected.
+
+{% endfor %}
+
+## Investigation Narrative
+
+{{ view.narrative }}
+
+## Final Recommendation
+
+**Decision:** {{ view.decision.upper() }}  
+**Confidence:** {{ view.confidence }}%  
+**Requires Escalation:** {{ 'Yes' if view.requires_escalation else 'No' }}
+
+### Justification
+
+{{ view.justification if view.justification is not none else 'N/A' }}
+
+### Next Steps
+
+{% for step in view.next_steps or [] %}
+- {{ step }}
+{% endfor %}
+
+---
+
+*This report was generated automatically by the High-Risk Investigation Agent.*
 """
+
+# Templates are compiled once at import; rendering writes straight into one buffer
+_TEMPLATE_ENV = Environment(autoescape=False, trim_blocks=True, lstrip_blocks=True, keep_trailing_newline=True)
+_TEMPLATE_ENV.filters['titleize'] = _titleize
+_TERMINAL_TEMPLATE = _TEMPLATE_ENV.from_string(_TERMINAL_TEMPLATE_SRC)
+_MD_TEMPLATE = _TEMPLATE_ENV.from_string(_MD_TEMPLATE_SRC)
+
+
+@dataclass(frozen=True)
+class ReportView:
+    """
+    Flattened, read-only view of the state fields shown in the text reports.
+    """
+    __slots__ = (
+        'entity_id', 'risk_score', 'patterns', 'narrative', 'risk_level', 'decision',
+        'confidence', 'requires_escalation', 'justification', 'next_steps', 'timestamp',
+    )
     
-    if 'justification' in recommendation:
-        output += f"Justification:\n{recommendation['justification']}\n\n"
+    entity_id: str
+    risk_score: float
+    patterns: List[Dict[str, Any]]
+    narrative: str
+    risk_level: str
+    decision: str
+    confidence: Any
+    requires_escalation: bool
+    justification: Optional[str]
+    next_steps: Optional[List[str]]
+    timestamp: datetime
     
-    if 'next_steps' in recommendation:
-        output += "Next Steps:\n"
-        for step in recommendation['next_steps']:
-            output += f"  • {step}\n"
+    @classmethod
+    def from_state(cls, final_state: Dict[str, Any]) -> "ReportView":
+        """
+        Build the view, resolving every default in one place.
+        
+        Args:
+            final_state: Final investigation state
+            
+        Returns:
+            Report view for the templates
+        """
+        recommendation = final_state.get('recommendation') or {}
+        return cls(
+            entity_id=final_state.get('entity_id', 'N/A'),
+            risk_score=final_state.get('risk_score', 0),
+            patterns=final_state.get('detected_patterns', []),
+            narrative=final_state.get('narrative', ''),
+            risk_level=recommendation.get('risk_level', 'N/A'),
+            decision=recommendation.get('decision', 'N/A'),
+            confidence=recommendation.get('confidence', 0),
+            requires_escalation=bool(recommendation.get('requires_escalation')),
+            justification=recommendation.get('justification'),
+            next_steps=recommendation.get('next_steps'),
+            timestamp=datetime.now(),
+        )
+
+
+def _dumps_json(data: Dict[str, Any]) -> bytes:
+    """
+    Encode data as indented UTF-8 JSON, using orjson when it is installed.
+    
+    Args:
+        data: JSON-compatible data (unknown types are encoded with str())
+        
+    Returns:
+        Encoded JSON document
+    """
+    if orjson is not None:
+        return orjson.dumps(data, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(data, indent=2, default=str, ensure_ascii=False).encode('utf-8')
+
+
+def _write_report(filepath: str, data: bytes):
+    """
+    Atomically write an encoded report, replacing any existing file.
     
-    output += f"\n{'='*70}\n"
+    Args:
+        filepath: Destination path
+        data: Encoded report contents
+    """
+    # Write to a uniquely named file beside the target and rename it, so readers
+    # never see a partial report and concurrent saves never share a temp file
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(filepath) or '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        # mkstemp creates the file owner-only; give it the usual report permissions
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def format_terminal_report(final_state: Dict[str, Any]) -> str:
+    """
+    Format investigation results for terminal display.
     
-    return output
+    Args:
+        final_state: Final investigation state
+        
+    Returns:
+        Formatted string for terminal output
+    """
+    return _TERMINAL_TEMPLATE.render(sep=_SEP, view=ReportView.from_state(final_state))
 
 
 def save_json_report(final_state: Dict[str, Any], filepath: str):
@@ -88,6 +249,9 @@ def save_json_report(final_state: Dict[str, Any], filepath: str):
         final_state: Final investigation state
         filepath: Path to save JSON file
     """
+    recommendation = final_state.get('recommendation') or {}
+    raw_data = final_state.get('raw_data') or {}
+    
     report = {
         "investigation_metadata": {
             "entity_id": final_state.get('entity_id'),
@@ -96,20 +260,20 @@ def save_json_report(final_state: Dict[str, Any], filepath: str):
         },
         "risk_assessment": {
             "risk_score": final_state.get('risk_score'),
-            "risk_level": final_state.get('recommendation', {}).get('risk_level'),
+            "risk_level": recommendation.get('risk_level'),
             "detected_patterns": final_state.get('detected_patterns', [])
         },
         "narrative": final_state.get('narrative'),
         "recommendation": final_state.get('recommendation'),
         "raw_data_summary": {
-            "profile": final_state.get('raw_data', {}).get('profile', {}),
-            "transaction_count": final_state.get('raw_data', {}).get('transactions', {}).get('total_transactions'),
-            "flag_count": final_state.get('raw_data', {}).get('flags', {}).get('total_flags')
+            "profile": raw_data.get('profile', {}),
+            "transaction_count": raw_data.get('transactions', {}).get('total_transactions'),
+            "flag_count": raw_data.get('flags', {}).get('total_flags')
         }
     }
     
-    with open(filepath, 'w') as f:
-        json.dump(report, f, indent=2, default=str)
+    # orjson emits bytes, so write them directly without a decode/encode round trip
+    _write_report(filepath, _dumps_json(report))
 
 
 def save_markdown_report(final_state: Dict[str, Any], filepath: str):
@@ -120,66 +284,6 @@ def save_markdown_report(final_state: Dict[str, Any], filepath: str):
         final_state: Final investigation state
         filepath: Path to save Markdown file
     """
-    entity_id = final_state.get('entity_id', 'N/A')
-    risk_score = final_state.get('risk_score', 0)
-    patterns = final_state.get('detected_patterns', [])
-    narrative = final_state.get('narrative', '')
-    recommendation = final_state.get('recommendation', {})
-    
-    md_content = f"""# Investigation Report: {entity_id}
-
-**Date:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-
-## Executive Summary
-
-- **Entity ID:** {entity_id}
-- **Risk Score:** {risk_score:.1f}/100
-- **Risk Level:** {recommendation.get('risk_level', 'N/A').upper()}
-- **Decision:** {recommendation.get('decision', 'N/A').upper()}
-- **Patterns Detected:** {len(patterns)}
-
-## Risk Assessment
-
-### Detected Patterns
-
-"""
-    
-    if patterns:
-        for pattern in patterns:
-            md_content += f"""
-#### {pattern['pattern_type'].replace('_', ' ').title()}
-- **Severity:** {pattern['severity'].upper()}
-- **Description:** {pattern['description']}
-- **Evidence:** {pattern.get('evidence', {})}
-
-"""
-    else:
-        md_content += "No suspicious patterns detected.\n\n"
-    
-    md_content += f"""
-## Investigation Narrative
-
-{narrative}
-
-## Final Recommendation
-
-**Decision:** {recommendation.get('decision', 'N/A').upper()}  
-**Confidence:** {recommendation.get('confidence', 0)}%  
-**Requires Escalation:** {'Yes' if recommendation.get('requires_escalation') else 'No'}
-
-### Justification
-
-{recommendation.get('justification', 'N/A')}
-
-### Next Steps
-
-"""
-    
-    if 'next_steps' in recommendation:
-        for step in recommendation['next_steps']:
-            md_content += f"- {step}\n"
-    
-    md_content += "\n---\n\n*This report was generated automatically by the High-Risk Investigation Agent.*\n"
+    content = _MD_TEMPLATE.render(view=ReportView.from_state(final_state))
     
-    with open(filepath, 'w') as f:
-        f.write(md_content)
+    _write_report(filepath, content.encode('utf-8'))